@@ -1,44 +1,49 @@
-import random
-from typing import Dict, List
+import time
+from typing import List
 
-from src.csp import CSP, Constraint
-from src.sudoku import print_sudoku_history
+from src.csp import (
+    CSP,
+    AllDifferent,
+    Inference,
+    SearchTrace,
+    TracePolicy,
+    VariableSelection,
+)
+from src.sudoku import convert_sudoku_text, parse_sudoku_line, print_sudoku_history
+
+_PUZZLE = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
 
 
 def main() -> None:
     indices: List[int] = [i for i in range(81)]
-    sudoku = {index: random.sample([1, 2, 3, 4, 5, 6, 7, 8, 9], 9) for index in indices}
-    csp: CSP[int, int] = CSP(indices, sudoku)
-    constraint = SudokuConstraint(indices)
-    csp.add_constraint(constraint)
-    solution = csp.backtracking_search()
-    if solution is None:
-        print("No solution found!")
-    else:
-        input("render?")
-        print_sudoku_history(constraint.history)
-
-
-class SudokuConstraint(Constraint[int, int]):
-    def __init__(self, indices: List[int]) -> None:
-        super().__init__(indices)
-        self.history: List[Dict[int, int]] = []
-
-    def satisfied(self, assignment: Dict[int, int]) -> bool:
-        self.history.append(assignment)
-        for i in range(9):
-            row = [assignment[j] for j in assignment.keys() if j // 9 == i]
-            if len(row) != len(set(row)):
-                return False
-            col = [assignment[j] for j in assignment.keys() if j % 9 == i]
-            if len(col) != len(set(col)):
-                return False
-        for x in range(3):
-            for y in range(3):
-                block = [assignment[j] for j in assignment.keys() if j // 9 // 3 == x and j % 9 // 3 == y]
-                if len(block) != len(set(block)):
-                    return False
-        return True
-
-
-main()
+    puzzle = parse_sudoku_line(_PUZZLE)
+    sudoku = {index: [puzzle[index]] if puzzle[index] != 0 else [1, 2, 3, 4, 5, 6, 7, 8, 9] for index in indices}
+    for inference in Inference:
+        csp: CSP[int, int] = CSP(indices, sudoku, VariableSelection.MRV, inference=inference)
+        for unit in _get_unit_indices():
+            csp.add_constraint(AllDifferent(unit))
+        start = time.perf_counter()
+        solution = csp.backtracking_search()
+        elapsed = time.perf_counter() - start
+        if solution is None:
+            print("No solution found!")
+        else:
+            print(f"{inference.name}\tnodes: {csp.nodes}\t{elapsed * 1000:.1f} ms")
+            print(convert_sudoku_text([solution[i] for i in indices]))
+    print(f"unique: {csp.count_solutions(limit=2) == 1}")
+    csp.trace = SearchTrace(TracePolicy.DELTA, capacity=10000)
+    csp.backtracking_search()
+    input("render?")
+    print_sudoku_history([state.get(i, 0) for i in indices] for state in csp.trace.replay())
+
+
+def _get_unit_indices() -> List[List[int]]:
+    return [
+        *[[i * 9 + j for j in range(9)] for i in range(9)],
+        *[[j * 9 + i for j in range(9)] for i in range(9)],
+        *[[(x * 3 + i) * 9 + y * 3 + j for i in range(3) for j in range(3)] for x in range(3) for y in range(3)],
+    ]
+
+
+if __name__ == "__main__":
+    main()
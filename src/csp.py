@@ -1,5 +1,27 @@
+import itertools
+import multiprocessing
+import random
 from abc import ABC, abstractmethod
-from typing import Dict, Generic, List, Optional, TypeVar
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from enum import Enum
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    OrderedDict,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from src.random_streams import derive_rngs
+from src.worker_stop import init_worker, worker_stop_event
 
 V = TypeVar("V")
 D = TypeVar("D")
@@ -13,22 +35,243 @@ class Constraint(Generic[V, D], ABC):
     def satisfied(self, assignment: Dict[V, D]) -> bool:
         ...
 
+    def reset(self) -> None:
+        pass
+
+    # Called with `variable` already placed in `assignment`. A constraint that keeps incremental state must leave it
+    # untouched when returning False; unassign is only called for assignments that were accepted.
+    def assign(self, variable: V, value: D, assignment: Dict[V, D]) -> bool:
+        return self.satisfied(assignment)
+
+    def unassign(self, variable: V, value: D) -> None:
+        pass
+
+
+class BinaryConstraint(Constraint[V, D]):
+    def __init__(self, first: V, second: V) -> None:
+        super().__init__([first, second])
+        self.first = first
+        self.second = second
+
+    @abstractmethod
+    def related(self, first_value: D, second_value: D) -> bool:
+        ...
+
+    def other(self, variable: V) -> V:
+        return self.second if variable == self.first else self.first
+
+    def supported(self, variable: V, value: D, other_value: D) -> bool:
+        if variable == self.first:
+            return self.related(value, other_value)
+        return self.related(other_value, value)
+
+    def satisfied(self, assignment: Dict[V, D]) -> bool:
+        if self.first not in assignment or self.second not in assignment:
+            return True
+        return self.related(assignment[self.first], assignment[self.second])
+
+
+class NotEqualConstraint(BinaryConstraint[V, D]):
+    def related(self, first_value: D, second_value: D) -> bool:
+        return first_value != second_value
+
+
+class GlobalConstraint(Constraint[V, D]):
+    @abstractmethod
+    def propagate(self, domains: Dict[V, List[D]]) -> Optional[Dict[V, List[D]]]:
+        ...
+
+
+class AllDifferent(GlobalConstraint[V, int]):
+    def __init__(self, variables: List[V]) -> None:
+        super().__init__(variables)
+        self.reset()
+
+    def satisfied(self, assignment: Dict[V, int]) -> bool:
+        values = [assignment[v] for v in self.variables if v in assignment]
+        return len(values) == len(set(values))
+
+    def reset(self) -> None:
+        self._used: int = 0
+
+    def assign(self, variable: V, value: int, assignment: Dict[V, int]) -> bool:
+        bit = 1 << value
+        if self._used & bit:
+            return False
+        self._used |= bit
+        return True
+
+    def unassign(self, variable: V, value: int) -> None:
+        self._used &= ~(1 << value)
+
+    def propagate(self, domains: Dict[V, List[int]]) -> Optional[Dict[V, List[int]]]:
+        masks = {v: _to_mask(domains[v]) for v in self.variables}
+        changed: Set[V] = set()
+        while True:
+            progress = False
+            for variable, mask in masks.items():
+                if mask & (mask - 1) != 0:
+                    continue
+                for other, other_mask in masks.items():
+                    if other != variable and other_mask & mask:
+                        if other_mask == mask:
+                            return None
+                        masks[other] = other_mask & ~mask
+                        changed.add(other)
+                        progress = True
+            union = 0
+            seen_twice = 0
+            for mask in masks.values():
+                seen_twice |= union & mask
+                union |= mask
+            available = bin(union).count("1")
+            if available < len(masks):
+                return None
+            # A value held by a single domain is only forced when every value has to be used.
+            hidden = union & ~seen_twice if available == len(masks) else 0
+            for variable, mask in masks.items():
+                if mask & hidden and mask & (mask - 1) != 0:
+                    single = mask & hidden
+                    if single & (single - 1) != 0:
+                        return None
+                    masks[variable] = single
+                    changed.add(variable)
+                    progress = True
+            if not progress:
+                return {v: [value for value in domains[v] if masks[v] >> value & 1] for v in changed}
+
+
+def _to_mask(values: List[int]) -> int:
+    mask = 0
+    for value in values:
+        mask |= 1 << value
+    return mask
+
+
+class VariableSelection(Enum):
+    FIRST = 1
+    MRV = 2
+
+
+class ValueOrdering(Enum):
+    DOMAIN = 1
+    LCV = 2
+    RANDOM = 3
+
+
+class Inference(Enum):
+    NONE = 1
+    FORWARD_CHECKING = 2
+    MAC = 3
+
+
+class TracePolicy(Enum):
+    OFF = 1
+    EVERY_NTH = 2
+    RING_BUFFER = 3
+    DELTA = 4
+
+
+class SearchTrace(Generic[V, D]):
+    def __init__(self, policy: TracePolicy = TracePolicy.OFF, interval: int = 1, capacity: int = 1000) -> None:
+        self.policy = policy
+        self.interval = interval
+        self.capacity = capacity
+        self.snapshots: Deque[Dict[V, D]] = deque(maxlen=capacity)
+        self.deltas: List[Tuple[V, D, bool]] = []
+        self.initial: Dict[V, D] = {}
+        self._pushes = 0
+
+    def clear(self, initial: Optional[Dict[V, D]] = None) -> None:
+        self.snapshots.clear()
+        self.deltas.clear()
+        self.initial = {} if initial is None else dict(initial)
+        self._pushes = 0
+
+    def push(self, variable: V, value: D, assignment: Dict[V, D]) -> None:
+        self._pushes += 1
+        if self.policy == TracePolicy.DELTA:
+            if len(self.deltas) < self.capacity:
+                self.deltas.append((variable, value, True))
+        elif self.policy == TracePolicy.RING_BUFFER or self._pushes % self.interval == 0:
+            self.snapshots.append(dict(assignment))
+
+    def pop(self, variable: V, value: D) -> None:
+        if self.policy == TracePolicy.DELTA and len(self.deltas) < self.capacity:
+            self.deltas.append((variable, value, False))
+
+    def replay(self) -> Iterator[Dict[V, D]]:
+        if self.policy != TracePolicy.DELTA:
+            yield from self.snapshots
+            return
+        state = dict(self.initial)
+        for variable, value, pushed in self.deltas:
+            if pushed:
+                state[variable] = value
+            else:
+                del state[variable]
+            yield dict(state)
+
+
+class Backtracking(Enum):
+    CHRONOLOGICAL = 1
+    BACKJUMPING = 2
+
 
 class CSP(Generic[V, D]):
-    def __init__(self, variables: List[V], domains: Dict[V, List[D]]) -> None:
+    def __init__(
+        self,
+        variables: List[V],
+        domains: Dict[V, List[D]],
+        variable_selection: VariableSelection = VariableSelection.FIRST,
+        value_ordering: ValueOrdering = ValueOrdering.DOMAIN,
+        inference: Inference = Inference.NONE,
+        backtracking: Backtracking = Backtracking.CHRONOLOGICAL,
+        nogood_capacity: int = 0,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        if backtracking == Backtracking.BACKJUMPING and inference != Inference.NONE:
+            raise ValueError()
         self.variables = variables
         self.domains = domains
+        self.variable_selection = variable_selection
+        self.value_ordering = value_ordering
+        self.inference = inference
+        self.backtracking = backtracking
+        self.nogood_capacity = nogood_capacity
+        self.rng: random.Random = rng if rng is not None else random.Random()
+        self.nodes: int = 0
+        self.should_stop: Optional[Callable[[], bool]] = None
+        self.trace: SearchTrace[V, D] = SearchTrace()
         self.constraints: Dict[V, List[Constraint[V, D]]] = {}
+        self._all_constraints: List[Constraint[V, D]] = []
+        self.neighbors: Dict[V, Set[V]] = {}
+        self.arcs: Dict[V, List[BinaryConstraint[V, D]]] = {}
+        self.propagators: Dict[V, List[GlobalConstraint[V, D]]] = {}
+        self._domains: Dict[V, List[D]] = domains
+        self._trail: List[Tuple[V, List[D]]] = []
+        self._failed: Optional[Constraint[V, D]] = None
+        self._nogoods: OrderedDict[Tuple[V, Tuple[V, ...], Tuple[D, ...]], None] = OrderedDict()
+        self._nogood_scopes: Dict[V, Dict[Tuple[V, ...], int]] = {}
         for variable in self.variables:
             self.constraints[variable] = []
+            self.neighbors[variable] = set()
+            self.arcs[variable] = []
+            self.propagators[variable] = []
             if variable not in self.domains:
                 raise LookupError()
 
     def add_constraint(self, constraint: Constraint[V, D]) -> None:
+        self._all_constraints.append(constraint)
         for variable in constraint.variables:
             if variable not in self.variables:
                 raise LookupError()
             self.constraints[variable].append(constraint)
+            self.neighbors[variable].update(v for v in constraint.variables if v != variable)
+            if isinstance(constraint, BinaryConstraint):
+                self.arcs[variable].append(constraint)
+            elif isinstance(constraint, GlobalConstraint):
+                self.propagators[variable].append(constraint)
 
     def consistent(self, variable: V, assignment: Dict[V, D]):
         for constraint in self.constraints[variable]:
@@ -36,16 +279,355 @@ class CSP(Generic[V, D]):
                 return False
         return True
 
-    def backtracking_search(self, assignment: Dict[V, D] = {}) -> Optional[Dict[V, D]]:
-        if len(assignment) == len(self.variables):
-            return assignment
-        unassigned = [v for v in self.variables if v not in assignment]
-        first: V = unassigned[0]
-        for value in self.domains[first]:
-            local_assignment = assignment.copy()
-            local_assignment[first] = value
-            if self.consistent(first, local_assignment):
-                result = self.backtracking_search(local_assignment)
-                if result is not None:
-                    return result
+    def _assign(self, variable: V, value: D, assignment: Dict[V, D]) -> bool:
+        assignment[variable] = value
+        constraints = self.constraints[variable]
+        for index, constraint in enumerate(constraints):
+            if not constraint.assign(variable, value, assignment):
+                self._failed = constraint
+                for accepted in constraints[:index]:
+                    accepted.unassign(variable, value)
+                del assignment[variable]
+                return False
+        return True
+
+    def _unassign(self, variable: V, assignment: Dict[V, D]) -> None:
+        value = assignment.pop(variable)
+        for constraint in self.constraints[variable]:
+            constraint.unassign(variable, value)
+
+    def _consistent_values(self, variable: V, assignment: Dict[V, D]) -> List[D]:
+        values: List[D] = []
+        for value in self._domains[variable]:
+            if self._assign(variable, value, assignment):
+                values.append(value)
+                self._unassign(variable, assignment)
+        return values
+
+    def _select_variable(self, assignment: Dict[V, D]) -> V:
+        if self.variable_selection == VariableSelection.FIRST:
+            return next(v for v in self.variables if v not in assignment)
+
+        def mrv_key(variable: V) -> Tuple[int, int]:
+            if self.inference == Inference.NONE:
+                remaining = len(self._consistent_values(variable, assignment))
+            else:
+                remaining = len(self._domains[variable])
+            degree = sum(1 for n in self.neighbors[variable] if n not in assignment)
+            return remaining, -degree
+
+        return min((v for v in self.variables if v not in assignment), key=mrv_key)
+
+    def _count_eliminated(self, variable: V, value: D, assignment: Dict[V, D]) -> int:
+        if not self._assign(variable, value, assignment):
+            return len(self.variables) * len(self._domains[variable])
+        eliminated = 0
+        for neighbor in self.neighbors[variable]:
+            if neighbor in assignment:
+                continue
+            remaining = len(self._consistent_values(neighbor, assignment))
+            eliminated += len(self._domains[neighbor]) - remaining
+        self._unassign(variable, assignment)
+        return eliminated
+
+    def _order_values(self, variable: V, assignment: Dict[V, D]) -> List[D]:
+        if self.value_ordering == ValueOrdering.DOMAIN:
+            return self._domains[variable]
+        if self.value_ordering == ValueOrdering.RANDOM:
+            return self.rng.sample(self._domains[variable], k=len(self._domains[variable]))
+        # Backjumping needs every rejected value to reach the search loop so its conflict is recorded; inconsistent
+        # values sort last since _count_eliminated charges them the maximum.
+        if self.backtracking == Backtracking.BACKJUMPING:
+            values = self._domains[variable]
+        else:
+            values = self._consistent_values(variable, assignment)
+        return sorted(values, key=lambda value: self._count_eliminated(variable, value, assignment))
+
+    def _prune(self, variable: V, values: List[D]) -> None:
+        self._trail.append((variable, self._domains[variable]))
+        self._domains[variable] = values
+
+    def _restore(self, mark: int) -> None:
+        while len(self._trail) > mark:
+            variable, values = self._trail.pop()
+            self._domains[variable] = values
+
+    def _forward_check(self, variable: V, assignment: Dict[V, D]) -> bool:
+        for neighbor in self.neighbors[variable]:
+            if neighbor in assignment:
+                continue
+            values = self._consistent_values(neighbor, assignment)
+            if len(values) < len(self._domains[neighbor]):
+                self._prune(neighbor, values)
+                if len(values) == 0:
+                    return False
+        return True
+
+    def _revise(self, variable: V, constraint: BinaryConstraint[V, D]) -> bool:
+        other_values = self._domains[constraint.other(variable)]
+        values = [
+            value
+            for value in self._domains[variable]
+            if any(constraint.supported(variable, value, other_value) for other_value in other_values)
+        ]
+        if len(values) == len(self._domains[variable]):
+            return False
+        self._prune(variable, values)
+        return True
+
+    def _run_propagator(self, constraint: GlobalConstraint[V, D]) -> Optional[List[V]]:
+        reductions = constraint.propagate(self._domains)
+        if reductions is None:
+            return None
+        for variable, values in reductions.items():
+            self._prune(variable, values)
+        return list(reductions.keys())
+
+    def _propagation_queue(self, variables: Iterable[V]) -> List[Tuple[V, Constraint[V, D]]]:
+        queue: List[Tuple[V, Constraint[V, D]]] = []
+        for variable in variables:
+            queue.extend((arc.other(variable), arc) for arc in self.arcs[variable])
+            queue.extend((variable, propagator) for propagator in self.propagators[variable])
+        return queue
+
+    def _ac3(self, queue: List[Tuple[V, Constraint[V, D]]]) -> bool:
+        while len(queue) > 0:
+            variable, constraint = queue.pop()
+            if isinstance(constraint, BinaryConstraint):
+                if not self._revise(variable, constraint):
+                    continue
+                if len(self._domains[variable]) == 0:
+                    return False
+                changed = [variable]
+            elif isinstance(constraint, GlobalConstraint):
+                reduced = self._run_propagator(constraint)
+                if reduced is None:
+                    return False
+                changed = reduced
+            for changed_variable in changed:
+                queue.extend(item for item in self._propagation_queue([changed_variable]) if item[1] is not constraint)
+        return True
+
+    def _infer(self, variable: V, assignment: Dict[V, D], mark: int) -> bool:
+        if self.inference == Inference.NONE:
+            return True
+        if not self._forward_check(variable, assignment):
+            return False
+        if self.inference == Inference.FORWARD_CHECKING:
+            return True
+        pruned = {v for v, _ in self._trail[mark:]}
+        return self._ac3(self._propagation_queue(pruned))
+
+    def backtracking_search(self, assignment: Optional[Dict[V, D]] = None) -> Optional[Dict[V, D]]:
+        return next(self.solutions(assignment), None)
+
+    def count_solutions(self, assignment: Optional[Dict[V, D]] = None, limit: Optional[int] = None) -> int:
+        return sum(1 for _ in itertools.islice(self.solutions(assignment), limit))
+
+    # The search runs on state held by this CSP and its constraints (working domains, trail, nogoods and the
+    # incremental constraint state), so only one generator per CSP may be active at a time; starting another one
+    # resets that state under the first.
+    def solutions(self, assignment: Optional[Dict[V, D]] = None) -> Iterator[Dict[V, D]]:
+        self.nodes = 0
+        self._domains = {variable: list(values) for variable, values in self.domains.items()}
+        self._trail = []
+        self._nogoods.clear()
+        self._nogood_scopes = {}
+        initial = {} if assignment is None else assignment
+        self.trace.clear(initial)
+        for constraint in self._all_constraints:
+            constraint.reset()
+        assignment = {}
+        for variable, value in initial.items():
+            if not self._assign(variable, value, assignment):
+                return
+            self._domains[variable] = [value]
+        if self.inference != Inference.NONE:
+            if not self._ac3(self._propagation_queue(self.variables)):
+                return
+        yield from self._search(assignment)
+
+    def _expand(self, assignment: Dict[V, D]) -> Tuple[V, Iterator[D], int]:
+        variable = self._select_variable(assignment)
+        return variable, iter(self._order_values(variable, assignment)), len(self._trail)
+
+    def _failure_conflict(self, variable: V, assignment: Dict[V, D]) -> Set[V]:
+        if self._failed is None:
+            return set()
+        return {v for v in self._failed.variables if v != variable and v in assignment}
+
+    def _record_nogood(self, variable: V, conflict: Set[V], assignment: Dict[V, D]) -> None:
+        if self.nogood_capacity <= 0:
+            return
+        scope = tuple(sorted(conflict, key=self.variables.index))
+        key = (variable, scope, tuple(assignment[v] for v in scope))
+        if key in self._nogoods:
+            self._nogoods.move_to_end(key)
+            return
+        self._nogoods[key] = None
+        scopes = self._nogood_scopes.setdefault(variable, {})
+        scopes[scope] = scopes.get(scope, 0) + 1
+        if len(self._nogoods) > self.nogood_capacity:
+            evicted_variable, evicted_scope, _ = self._nogoods.popitem(last=False)[0]
+            evicted_scopes = self._nogood_scopes[evicted_variable]
+            evicted_scopes[evicted_scope] -= 1
+            if evicted_scopes[evicted_scope] == 0:
+                del evicted_scopes[evicted_scope]
+
+    # One hash probe per distinct scope recorded for `variable`, not a single lookup per frame.
+    def _nogood_conflict(self, variable: V, assignment: Dict[V, D]) -> Optional[Set[V]]:
+        for scope in self._nogood_scopes.get(variable, {}):
+            if all(v in assignment for v in scope):
+                key = (variable, scope, tuple(assignment[v] for v in scope))
+                if key in self._nogoods:
+                    self._nogoods.move_to_end(key)
+                    return set(scope)
         return None
+
+    def _push_frame(
+        self, assignment: Dict[V, D], stack: List[Tuple[V, Iterator[D], int]], conflicts: List[Set[V]]
+    ) -> None:
+        variable, values, mark = self._expand(assignment)
+        conflict: Set[V] = set()
+        if self.backtracking == Backtracking.BACKJUMPING:
+            nogood = self._nogood_conflict(variable, assignment)
+            if nogood is not None:
+                values, conflict = iter([]), nogood
+        stack.append((variable, values, mark))
+        conflicts.append(conflict)
+
+    def _untrace(self, variable: V, assignment: Dict[V, D]) -> None:
+        if self.trace.policy != TracePolicy.OFF:
+            self.trace.pop(variable, assignment[variable])
+
+    def _backjump(
+        self,
+        conflict: Set[V],
+        assignment: Dict[V, D],
+        stack: List[Tuple[V, Iterator[D], int]],
+        conflicts: List[Set[V]],
+    ) -> None:
+        while len(stack) > 0 and stack[-1][0] not in conflict:
+            variable, _, mark = stack.pop()
+            conflicts.pop()
+            self._untrace(variable, assignment)
+            self._unassign(variable, assignment)
+            self._restore(mark)
+        if len(stack) > 0:
+            conflicts[-1].update(v for v in conflict if v != stack[-1][0])
+
+    def _search(self, assignment: Dict[V, D]) -> Iterator[Dict[V, D]]:
+        self.nodes += 1
+        if len(assignment) == len(self.variables):
+            yield dict(assignment)
+            return
+        backjumping = self.backtracking == Backtracking.BACKJUMPING
+        stack: List[Tuple[V, Iterator[D], int]] = []
+        conflicts: List[Set[V]] = []
+        self._push_frame(assignment, stack, conflicts)
+        while len(stack) > 0:
+            if self.should_stop is not None and self.should_stop():
+                return
+            variable, values, mark = stack[-1]
+            if variable in assignment:
+                self._untrace(variable, assignment)
+                self._unassign(variable, assignment)
+                self._restore(mark)
+            for value in values:
+                if self._assign(variable, value, assignment):
+                    if self.inference != Inference.NONE:
+                        self._prune(variable, [value])
+                    if self._infer(variable, assignment, mark):
+                        break
+                    self._restore(mark)
+                    self._unassign(variable, assignment)
+                elif backjumping:
+                    conflicts[-1].update(self._failure_conflict(variable, assignment))
+            else:
+                stack.pop()
+                conflict = conflicts.pop()
+                if backjumping:
+                    self._record_nogood(variable, conflict, assignment)
+                    self._backjump(conflict, assignment, stack, conflicts)
+                continue
+            self.nodes += 1
+            if self.trace.policy != TracePolicy.OFF:
+                self.trace.push(variable, assignment[variable], assignment)
+            if len(assignment) == len(self.variables):
+                if backjumping:
+                    for depth, conflict in enumerate(conflicts):
+                        conflict.update(frame[0] for frame in stack[:depth])
+                yield dict(assignment)
+            else:
+                self._push_frame(assignment, stack, conflicts)
+
+
+def _search_subtree(
+    factory: Callable[[], CSP[V, D]], assignment: Dict[V, D], limit: Optional[int], rng: random.Random
+) -> Tuple[int, Optional[Dict[V, D]], int]:
+    csp = factory()
+    csp.rng = rng
+    stop_event = worker_stop_event()
+    if stop_event is not None:
+        csp.should_stop = stop_event.is_set
+    count = 0
+    first: Optional[Dict[V, D]] = None
+    for solution in itertools.islice(csp.solutions(assignment), limit):
+        if first is None:
+            first = solution
+        count += 1
+    return count, first, csp.nodes
+
+
+def _split(csp: CSP[V, D], depth: int) -> List[Dict[V, D]]:
+    variables = csp.variables[:depth]
+    subproblems: List[Dict[V, D]] = []
+    for values in itertools.product(*[csp.domains[v] for v in variables]):
+        assignment = dict(zip(variables, values))
+        if all(csp.consistent(v, assignment) for v in variables):
+            subproblems.append(assignment)
+    return subproblems
+
+
+def _parallel_search(
+    factory: Callable[[], CSP[V, D]], workers: int, depth: int, limit: Optional[int], rng: Optional[random.Random]
+) -> Tuple[int, Optional[Dict[V, D]], int]:
+    subproblems = _split(factory(), depth)
+    rngs = derive_rngs(rng if rng is not None else random.Random(), len(subproblems))
+    stop_event = multiprocessing.Event()
+    count = 0
+    first: Optional[Dict[V, D]] = None
+    nodes = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(stop_event,)) as executor:
+        futures = [
+            executor.submit(_search_subtree, factory, subproblem, limit, subproblem_rng)
+            for subproblem, subproblem_rng in zip(subproblems, rngs)
+        ]
+        for future in as_completed(futures):
+            subtree_count, subtree_first, subtree_nodes = future.result()
+            count += subtree_count
+            nodes += subtree_nodes
+            if first is None:
+                first = subtree_first
+            if limit is not None and count >= limit:
+                stop_event.set()
+                for pending in futures:
+                    pending.cancel()
+                return limit, first, nodes
+    return count, first, nodes
+
+
+def parallel_backtracking_search(
+    factory: Callable[[], CSP[V, D]], workers: int, depth: int = 1, rng: Optional[random.Random] = None
+) -> Optional[Dict[V, D]]:
+    return _parallel_search(factory, workers, depth, 1, rng)[1]
+
+
+def parallel_count_solutions(
+    factory: Callable[[], CSP[V, D]],
+    workers: int,
+    depth: int = 1,
+    limit: Optional[int] = None,
+    rng: Optional[random.Random] = None,
+) -> int:
+    return _parallel_search(factory, workers, depth, limit, rng)[0]
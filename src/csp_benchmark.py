@@ -0,0 +1,124 @@
+import functools
+import os
+import time
+import tracemalloc
+from itertools import combinations
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.csp import (
+    CSP,
+    Backtracking,
+    D,
+    Inference,
+    NotEqualConstraint,
+    V,
+    ValueOrdering,
+    VariableSelection,
+    _parallel_search,
+)
+from src.queens import QueensPairConstraint, _build_queens_csp
+from src.send_more_money import SendMoreMoneyConstraint
+
+
+def main() -> None:
+    _benchmark_trail()
+    _benchmark_parallel()
+    _benchmark_backjumping()
+
+
+def _benchmark_trail() -> None:
+    for size in [8, 12, 16]:
+        csp = _build_queens_csp(size, VariableSelection.FIRST, ValueOrdering.DOMAIN, Inference.NONE)
+        print(f"queens {size}")
+        _report("copying", *_measure(lambda: _copying_backtracking_search(csp, {}, [0])))
+        _report("trail", *_measure(lambda: _trail_backtracking_search(csp)))
+
+
+def _benchmark_parallel() -> None:
+    factory = functools.partial(
+        _build_queens_csp, 11, VariableSelection.FIRST, ValueOrdering.DOMAIN, Inference.FORWARD_CHECKING
+    )
+    print("queens 11 count")
+    for workers in range(1, (os.cpu_count() or 1) + 1):
+        start = time.perf_counter()
+        count, _, nodes = _parallel_search(factory, workers, 2, None, None)
+        elapsed = time.perf_counter() - start
+        print(f"  workers: {workers}\tsolutions: {count}\tnodes: {nodes}\t{elapsed:.2f} s")
+
+
+def _benchmark_backjumping() -> None:
+    settings = [
+        (Backtracking.CHRONOLOGICAL, 0),
+        (Backtracking.BACKJUMPING, 0),
+        (Backtracking.BACKJUMPING, 10000),
+    ]
+    print("queens 10 count")
+    for backtracking, nogood_capacity in settings:
+        columns = list(range(1, 11))
+        queens: CSP[int, int] = CSP(
+            columns,
+            {c: list(range(1, 11)) for c in columns},
+            backtracking=backtracking,
+            nogood_capacity=nogood_capacity,
+        )
+        for first, second in combinations(columns, 2):
+            queens.add_constraint(QueensPairConstraint(first, second))
+        start = time.perf_counter()
+        count = queens.count_solutions()
+        elapsed = time.perf_counter() - start
+        print(f"  {backtracking.name}\tnogoods: {nogood_capacity}\tsolutions: {count}\t", end="")
+        print(f"nodes: {queens.nodes}\t{elapsed:.2f} s")
+    print("send more money")
+    for backtracking, nogood_capacity in settings:
+        letters = ["S", "E", "N", "D", "M", "O", "R", "Y"]
+        digits = {letter: list(range(10)) for letter in letters}
+        digits["M"] = [1]
+        send: CSP[str, int] = CSP(letters, digits, backtracking=backtracking, nogood_capacity=nogood_capacity)
+        for first_letter, second_letter in combinations(letters, 2):
+            send.add_constraint(NotEqualConstraint(first_letter, second_letter))
+        send.add_constraint(SendMoreMoneyConstraint(letters))
+        start = time.perf_counter()
+        send.backtracking_search()
+        elapsed = time.perf_counter() - start
+        print(f"  {backtracking.name}\tnogoods: {nogood_capacity}\tnodes: {send.nodes}\t{elapsed:.2f} s")
+
+
+def _copying_backtracking_search(
+    csp: CSP[V, D], assignment: Dict[V, D], nodes: List[int]
+) -> Tuple[Optional[Dict[V, D]], int]:
+    nodes[0] += 1
+    if len(assignment) == len(csp.variables):
+        return assignment, nodes[0]
+    unassigned = [v for v in csp.variables if v not in assignment]
+    first: V = unassigned[0]
+    for value in csp.domains[first]:
+        local_assignment = assignment.copy()
+        local_assignment[first] = value
+        if csp.consistent(first, local_assignment):
+            result, _ = _copying_backtracking_search(csp, local_assignment, nodes)
+            if result is not None:
+                return result, nodes[0]
+    return None, nodes[0]
+
+
+def _trail_backtracking_search(csp: CSP[V, D]) -> Tuple[Optional[Dict[V, D]], int]:
+    return csp.backtracking_search(), csp.nodes
+
+
+def _measure(search: Callable[[], Tuple[Optional[Dict[V, D]], int]]) -> Tuple[Optional[Dict[V, D]], int, float, int]:
+    start = time.perf_counter()
+    solution, nodes = search()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    search()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return solution, nodes, elapsed, peak
+
+
+def _report(name: str, solution: Optional[Dict[V, D]], nodes: int, elapsed: float, peak: int) -> None:
+    print(f"  {name}\tnodes: {nodes}\t{nodes / elapsed:.0f} nodes/s\tpeak: {peak / 1024:.1f} KiB\t{solution}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,49 @@
 import heapq
 import random
+import time
 from abc import ABC, abstractmethod
+from collections import defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from enum import Enum
-from statistics import mean
-from typing import Callable, Generic, List, Tuple, Type, TypeVar
+from itertools import accumulate
+from statistics import mean, pstdev
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from src.genetic_telemetry import GenerationRecord
 
 T = TypeVar("T", bound="Chromosome")
+R = TypeVar("R")
 
 
 class Chromosome(ABC):
+    fitness_cache: Optional[float] = None
+
     @abstractmethod
     def fitness(self) -> float:
         ...
 
     @classmethod
     @abstractmethod
-    def random_instance(cls: Type[T]) -> T:
+    def random_instance(cls: Type[T], rng: random.Random) -> T:
         ...
 
     @abstractmethod
-    def crossover(self: T, other: T) -> Tuple[T, T]:
+    def crossover(self: T, other: T, rng: random.Random) -> Tuple[T, T]:
         ...
 
     @abstractmethod
-    def mutate(self: T) -> T:
+    def mutate(self: T, rng: random.Random) -> T:
         ...
 
 
@@ -32,6 +52,26 @@ class SelectionType(Enum):
     TOURNAMENT = 2
 
 
+class ReplacementType(Enum):
+    GENERATIONAL = 1
+    STEADY_STATE = 2
+
+
+class StagnationAction(Enum):
+    RESEED = 1
+    STOP = 2
+
+
+class EvaluationType(Enum):
+    SERIAL = 1
+    THREAD = 2
+    PROCESS = 3
+
+
+def _evaluate_fitness(chromosome: Chromosome) -> float:
+    return chromosome.fitness()
+
+
 C = TypeVar("C", bound=Chromosome)
 
 
@@ -44,6 +84,17 @@ class GeneticAlgorithm(Generic[C]):
         mutation_chance: float = 0.01,
         crossover_chance: float = 0.7,
         selection_type: SelectionType = SelectionType.TOURNAMENT,
+        evaluation_type: EvaluationType = EvaluationType.SERIAL,
+        workers: Optional[int] = None,
+        chunk_size: int = 16,
+        elitism: int = 0,
+        replacement_type: ReplacementType = ReplacementType.GENERATIONAL,
+        replacement_size: int = 2,
+        stagnation_limit: Optional[int] = None,
+        stagnation_action: StagnationAction = StagnationAction.RESEED,
+        reseed_fraction: float = 0.5,
+        telemetry: Optional[Callable[[GenerationRecord], None]] = None,
+        rng: Optional[random.Random] = None,
     ):
         self._population: List[C] = initial_population
         self._threshold: float = threshold
@@ -51,16 +102,89 @@ class GeneticAlgorithm(Generic[C]):
         self._mutation_chance: float = mutation_chance
         self._crossover_chance: float = crossover_chance
         self._selection_type: SelectionType = selection_type
-        self._fitness_key: Callable[[C], float] = type(self._population[0]).fitness
+        self._evaluation_type: EvaluationType = evaluation_type
+        self._workers: Optional[int] = workers
+        self._chunk_size: int = chunk_size
+        self._executor: Optional[Executor] = None
+        self._elitism: int = elitism
+        self._replacement_type: ReplacementType = replacement_type
+        self._replacement_size: int = replacement_size
+        self._stagnation_limit: Optional[int] = stagnation_limit
+        self._stagnation_action: StagnationAction = stagnation_action
+        self._reseed_fraction: float = reseed_fraction
+        self._telemetry: Optional[Callable[[GenerationRecord], None]] = telemetry
+        self._rng: random.Random = rng if rng is not None else random.Random()
+        self._phase_times: Dict[str, float] = defaultdict(float)
+        self._cum_weights: List[float] = []
+        self._evaluations: int = 0
+        self.evaluation_counts: List[int] = []
+        self.generations: int = 0
+        self.should_stop: Optional[Callable[[], bool]] = None
+
+    def _fitness(self, chromosome: C) -> float:
+        if chromosome.fitness_cache is None:
+            chromosome.fitness_cache = chromosome.fitness()
+            self._evaluations += 1
+        return chromosome.fitness_cache
+
+    def _create_executor(self) -> Optional[Executor]:
+        if self._evaluation_type == EvaluationType.THREAD:
+            return ThreadPoolExecutor(max_workers=self._workers)
+        if self._evaluation_type == EvaluationType.PROCESS:
+            return ProcessPoolExecutor(max_workers=self._workers)
+        return None
+
+    def _evaluate_population(self) -> None:
+        pending = list({id(x): x for x in self._population if x.fitness_cache is None}.values())
+        if len(pending) == 0:
+            return
+        if self._executor is None:
+            scores: Iterable[float] = [x.fitness() for x in pending]
+        else:
+            scores = self._executor.map(_evaluate_fitness, pending, chunksize=self._chunk_size)
+        for chromosome, score in zip(pending, scores):
+            chromosome.fitness_cache = score
+        self._evaluations += len(pending)
+
+    def _timed(self, phase: str, function: Callable[..., R], *args: Any) -> R:
+        if self._telemetry is None:
+            return function(*args)
+        start = time.perf_counter()
+        result = function(*args)
+        self._phase_times[phase] += time.perf_counter() - start
+        return result
+
+    def _record(self, generation: int, best: C) -> None:
+        if self._telemetry is None:
+            return
+        scores = [self._fitness(x) for x in self._population]
+        self._telemetry(
+            GenerationRecord(
+                generation=generation,
+                best=self._fitness(best),
+                mean=mean(scores),
+                diversity=pstdev(scores),
+                evaluations=self._evaluations,
+                selection_time=self._phase_times["selection"],
+                crossover_time=self._phase_times["crossover"],
+                mutation_time=self._phase_times["mutation"],
+                evaluation_time=self._phase_times["evaluation"],
+            )
+        )
+        self._phase_times.clear()
+
+    def _offspring(self, children: Tuple[C, ...]) -> Tuple[C, ...]:
+        for child in children:
+            child.fitness_cache = None
+        return children
 
     def _pick_roulette(self) -> Tuple[C, C]:
-        wheel = [x.fitness() for x in self._population]
-        chosen = random.choices(self._population, weights=wheel, k=2)
+        chosen = self._rng.choices(self._population, cum_weights=self._cum_weights, k=2)
         return chosen[0], chosen[1]
 
     def _pick_tournament(self) -> Tuple[C, C]:
-        participants = random.choices(self._population, k=(len(self._population) // 2))
-        chosen = heapq.nlargest(2, participants, key=self._fitness_key)
+        participants = self._rng.choices(self._population, k=(len(self._population) // 2))
+        chosen = heapq.nlargest(2, participants, key=self._fitness)
         return chosen[0], chosen[1]
 
     def _pick_parents(self) -> Tuple[C, C]:
@@ -69,27 +193,82 @@ class GeneticAlgorithm(Generic[C]):
         else:
             return self._pick_tournament()
 
-    def _reproduce_and_replace(self) -> None:
+    def _breed(self, size: int) -> List[C]:
         new_population: List[C] = []
-        while len(new_population) < len(self._population):
-            if random.random() < self._crossover_chance:
-                parents = self._pick_parents()
-                new_population.extend(parents[0].crossover(parents[1]))
-            elif random.random() < self._mutation_chance:
-                new_population.append(self._pick_parents()[0].mutate())
+        while len(new_population) < size:
+            parents = self._timed("selection", self._pick_parents)
+            if self._rng.random() < self._crossover_chance:
+                children = self._timed("crossover", parents[0].crossover, parents[1], self._rng)
+                new_population.extend(self._offspring(children))
+            elif self._rng.random() < self._mutation_chance:
+                new_population.extend(self._offspring((self._timed("mutation", parents[0].mutate, self._rng),)))
             else:
-                new_population.append(self._pick_parents()[0])
-        self._population = new_population[: len(self._population)]
+                new_population.append(parents[0])
+        return new_population[:size]
+
+    def _reproduce_and_replace(self) -> None:
+        if self._selection_type == SelectionType.ROULETTE:
+            self._cum_weights = list(accumulate(self._fitness(x) for x in self._population))
+        if self._replacement_type == ReplacementType.STEADY_STATE:
+            self._replace_worst(self._breed(self._replacement_size))
+        else:
+            elites = self.elites(self._elitism)
+            self._population = elites + self._breed(len(self._population) - len(elites))
+
+    def _replace_worst(self, replacements: List[C]) -> None:
+        ranking = sorted(range(len(self._population)), key=lambda i: self._fitness(self._population[i]))
+        for index, replacement in zip(ranking, replacements):
+            self._population[index] = replacement
+
+    def _reseed(self) -> None:
+        chromosome_type = type(self._population[0])
+        size = int(len(self._population) * self._reseed_fraction)
+        self._replace_worst([chromosome_type.random_instance(self._rng) for _ in range(size)])
+
+    def elites(self, k: int) -> List[C]:
+        if k <= 0:
+            return []
+        return heapq.nlargest(k, self._population, key=self._fitness)
 
-    def run(self) -> C:
-        best: C = max(self._population, key=self._fitness_key)
-        for generation in range(self._max_generations):
-            if best.fitness() >= self._threshold:
+    def immigrate(self, migrants: List[C]) -> None:
+        self._replace_worst(migrants)
+
+    def run(self, max_generations: Optional[int] = None) -> C:
+        self._executor = self._create_executor()
+        try:
+            return self._run(self._max_generations if max_generations is None else max_generations)
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def _run(self, max_generations: int) -> C:
+        self._evaluate_population()
+        best: C = max(self._population, key=self._fitness)
+        self.evaluation_counts.append(self._evaluations)
+        stagnant_generations = 0
+        for _ in range(max_generations):
+            if self._fitness(best) >= self._threshold or (self.should_stop is not None and self.should_stop()):
                 return best
-            if generation % 100 == 0:
-                print(f"{generation}\t{best.fitness()}\t{mean(map(self._fitness_key, self._population))}")
+            generation = self.generations
+            self.generations += 1
+            self._evaluations = 0
             self._reproduce_and_replace()
-            highest: C = max(self._population, key=self._fitness_key)
-            if highest.fitness() > best.fitness():
+            self._timed("evaluation", self._evaluate_population)
+            highest: C = max(self._population, key=self._fitness)
+            if self._fitness(highest) > self._fitness(best):
                 best = highest
+                stagnant_generations = 0
+            else:
+                stagnant_generations += 1
+            if self._stagnation_limit is not None and stagnant_generations >= self._stagnation_limit:
+                if self._stagnation_action == StagnationAction.STOP:
+                    self.evaluation_counts.append(self._evaluations)
+                    self._record(generation, best)
+                    return best
+                self._reseed()
+                self._timed("evaluation", self._evaluate_population)
+                stagnant_generations = 0
+            self.evaluation_counts.append(self._evaluations)
+            self._record(generation, best)
         return best
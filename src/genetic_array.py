@@ -0,0 +1,142 @@
+import time
+from abc import abstractmethod
+from collections import defaultdict
+from typing import Any, Callable, Dict, Generic, Optional, Type, TypeVar
+
+import numpy as np
+
+from src.genetic import Chromosome, R, SelectionType
+from src.genetic_telemetry import GenerationRecord
+
+A = TypeVar("A", bound="ArrayChromosome")
+
+
+class ArrayChromosome(Chromosome):
+    @classmethod
+    @abstractmethod
+    def random_genomes(cls, size: int, rng: np.random.Generator) -> np.ndarray:
+        ...
+
+    @classmethod
+    @abstractmethod
+    def batch_fitness(cls, genomes: np.ndarray) -> np.ndarray:
+        ...
+
+    @classmethod
+    @abstractmethod
+    def batch_mutate(cls, genomes: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        ...
+
+    @classmethod
+    @abstractmethod
+    def from_genome(cls: Type[A], genome: np.ndarray) -> A:
+        ...
+
+
+class ArrayGeneticAlgorithm(Generic[A]):
+    def __init__(
+        self,
+        chromosome_type: Type[A],
+        population_size: int,
+        threshold: float,
+        max_generations: int = 100,
+        mutation_chance: float = 0.01,
+        crossover_chance: float = 0.7,
+        selection_type: SelectionType = SelectionType.TOURNAMENT,
+        tournament_size: int = 4,
+        telemetry: Optional[Callable[[GenerationRecord], None]] = None,
+        rng: Optional[np.random.Generator] = None,
+    ):
+        self._chromosome_type: Type[A] = chromosome_type
+        self._rng: np.random.Generator = rng if rng is not None else np.random.default_rng()
+        self._population: np.ndarray = chromosome_type.random_genomes(population_size, self._rng)
+        self._threshold: float = threshold
+        self._max_generations: int = max_generations
+        self._mutation_chance: float = mutation_chance
+        self._crossover_chance: float = crossover_chance
+        self._selection_type: SelectionType = selection_type
+        self._tournament_size: int = tournament_size
+        self._telemetry: Optional[Callable[[GenerationRecord], None]] = telemetry
+        self._phase_times: Dict[str, float] = defaultdict(float)
+
+    def _timed(self, phase: str, function: Callable[..., R], *args: Any) -> R:
+        if self._telemetry is None:
+            return function(*args)
+        start = time.perf_counter()
+        result = function(*args)
+        self._phase_times[phase] += time.perf_counter() - start
+        return result
+
+    def _record(self, generation: int, best_score: float, scores: np.ndarray) -> None:
+        if self._telemetry is None:
+            return
+        self._telemetry(
+            GenerationRecord(
+                generation=generation,
+                best=float(best_score),
+                mean=float(scores.mean()),
+                diversity=float(scores.std()),
+                evaluations=len(scores),
+                selection_time=self._phase_times["selection"],
+                crossover_time=self._phase_times["crossover"],
+                mutation_time=self._phase_times["mutation"],
+                evaluation_time=self._phase_times["evaluation"],
+            )
+        )
+        self._phase_times.clear()
+
+    def _pick_roulette(self, scores: np.ndarray, k: int) -> np.ndarray:
+        if (scores < 0).any():
+            raise ValueError("roulette selection requires non-negative fitness scores")
+        cum_weights = np.cumsum(scores)
+        if cum_weights[-1] == 0:
+            return self._rng.integers(len(scores), size=k)
+        return np.searchsorted(cum_weights, self._rng.random(size=k) * cum_weights[-1], side="right")
+
+    def _pick_tournament(self, scores: np.ndarray, k: int) -> np.ndarray:
+        participants = self._rng.integers(len(scores), size=(k, self._tournament_size))
+        return participants[np.arange(k), np.argmax(scores[participants], axis=1)]
+
+    def _pick_parents(self, scores: np.ndarray, k: int) -> np.ndarray:
+        if self._selection_type == SelectionType.ROULETTE:
+            return self._pick_roulette(scores, k)
+        else:
+            return self._pick_tournament(scores, k)
+
+    def _crossover(self, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+        pairs, length = first.shape
+        left = self._rng.integers(length, size=pairs)
+        right = self._rng.integers(length - 1, size=pairs)
+        right += right >= left
+        left, right = np.minimum(left, right), np.maximum(left, right)
+        positions = np.arange(length)
+        swapped = (positions >= left[:, None]) & (positions < right[:, None])
+        swapped &= self._rng.random(size=(pairs, 1)) < self._crossover_chance
+        return np.concatenate([np.where(swapped, second, first), np.where(swapped, first, second)])
+
+    def _reproduce_and_replace(self, scores: np.ndarray) -> None:
+        size = len(self._population)
+        pairs = (size + 1) // 2
+        parents = self._population[self._timed("selection", self._pick_parents, scores, pairs * 2)]
+        children = self._timed("crossover", self._crossover, parents[:pairs], parents[pairs:])[:size]
+        mutated = self._rng.random(size=size) < self._mutation_chance
+        if mutated.any():
+            children[mutated] = self._timed(
+                "mutation", self._chromosome_type.batch_mutate, children[mutated], self._rng
+            )
+        self._population = children
+
+    def run(self) -> A:
+        scores = self._chromosome_type.batch_fitness(self._population)
+        best = self._population[np.argmax(scores)].copy()
+        best_score = scores.max()
+        for generation in range(self._max_generations):
+            if best_score >= self._threshold:
+                break
+            self._reproduce_and_replace(scores)
+            scores = self._timed("evaluation", self._chromosome_type.batch_fitness, self._population)
+            highest = np.argmax(scores)
+            if scores[highest] > best_score:
+                best, best_score = self._population[highest].copy(), scores[highest]
+            self._record(generation, best_score, scores)
+        return self._chromosome_type.from_genome(best)
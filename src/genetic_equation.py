@@ -1,20 +1,30 @@
 import random
+import sys
 from copy import deepcopy
 from typing import List, Tuple
 
-from src.genetic import Chromosome, GeneticAlgorithm
+import numpy as np
+
+from src.genetic import GeneticAlgorithm
+from src.genetic_array import ArrayChromosome
+from src.genetic_telemetry import ProgressPrinter
 
 
 def main() -> None:
-    initial_population: List[Equation] = [Equation.random_instance() for _ in range(20)]
+    rng = random.Random(int(sys.argv[sys.argv.index("--seed") + 1]) if "--seed" in sys.argv else None)
+    initial_population: List[Equation] = [Equation.random_instance(rng) for _ in range(20)]
     algorithm: GeneticAlgorithm[Equation] = GeneticAlgorithm(
-        initial_population=initial_population, threshold=13.0, mutation_chance=0.1
+        initial_population=initial_population,
+        threshold=13.0,
+        mutation_chance=0.1,
+        telemetry=ProgressPrinter(),
+        rng=rng,
     )
     result = algorithm.run()
     print(result)
 
 
-class Equation(Chromosome):
+class Equation(ArrayChromosome):
     def __init__(self, x: int, y: int) -> None:
         self.x: int = x
         self.y: int = y
@@ -23,30 +33,52 @@ class Equation(Chromosome):
         return 6 * self.x - self.x * self.x + 4 * self.y - self.y * self.y
 
     @classmethod
-    def random_instance(cls) -> "Equation":
-        return Equation(random.randrange(100), random.randrange(100))
+    def random_instance(cls, rng: random.Random) -> "Equation":
+        return Equation(rng.randrange(100), rng.randrange(100))
 
-    def crossover(self: "Equation", other: "Equation") -> Tuple["Equation", "Equation"]:
+    def crossover(self: "Equation", other: "Equation", rng: random.Random) -> Tuple["Equation", "Equation"]:
         child1: Equation = deepcopy(self)
         child2: Equation = deepcopy(other)
         child1.y = other.y
         child2.y = self.y
         return child1, child2
 
-    def mutate(self) -> None:
-        if random.choice([True, False]):
-            if random.choice([True, False]):
-                self.x += 1
+    def mutate(self, rng: random.Random) -> "Equation":
+        mutated: Equation = deepcopy(self)
+        if rng.choice([True, False]):
+            if rng.choice([True, False]):
+                mutated.x += 1
             else:
-                self.x -= 1
+                mutated.x -= 1
         else:
-            if random.choice([True, False]):
-                self.y += 1
+            if rng.choice([True, False]):
+                mutated.y += 1
             else:
-                self.y -= 1
+                mutated.y -= 1
+        return mutated
+
+    @classmethod
+    def random_genomes(cls, size: int, rng: np.random.Generator) -> np.ndarray:
+        return rng.integers(100, size=(size, 2))
+
+    @classmethod
+    def batch_fitness(cls, genomes: np.ndarray) -> np.ndarray:
+        x, y = genomes[:, 0], genomes[:, 1]
+        return 6 * x - x * x + 4 * y - y * y
+
+    @classmethod
+    def batch_mutate(cls, genomes: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        mutated = genomes.copy()
+        mutated[np.arange(len(genomes)), rng.integers(2, size=len(genomes))] += rng.choice([-1, 1], size=len(genomes))
+        return mutated
+
+    @classmethod
+    def from_genome(cls, genome: np.ndarray) -> "Equation":
+        return Equation(int(genome[0]), int(genome[1]))
 
     def __str__(self) -> str:
         return f"X: {self.x} Y: {self.y} Fitness {self.fitness()}"
 
 
-main()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import copy
+import multiprocessing
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+from typing import Callable, Generic, List, Optional, Tuple
+
+from src.genetic import C, GeneticAlgorithm, SelectionType
+from src.genetic_sudoku import SudokuChromosome
+from src.genetic_telemetry import EpochRecord
+from src.random_streams import derive_rngs
+from src.worker_stop import init_worker, worker_stop_event
+
+
+class Topology(Enum):
+    RING = 1
+    RANDOM = 2
+
+
+def _run_epoch(island: GeneticAlgorithm[C], generations: int, threshold: float) -> Tuple[GeneticAlgorithm[C], C]:
+    stop_event = worker_stop_event()
+    if stop_event is not None:
+        island.should_stop = stop_event.is_set
+    best = island.run(generations)
+    island.should_stop = None
+    if stop_event is not None and best.fitness() >= threshold:
+        stop_event.set()
+    return island, best
+
+
+class IslandModel(Generic[C]):
+    def __init__(
+        self,
+        islands: List[GeneticAlgorithm[C]],
+        threshold: float,
+        max_generations: int = 100,
+        migration_interval: int = 10,
+        migration_size: int = 2,
+        topology: Topology = Topology.RING,
+        workers: Optional[int] = None,
+        telemetry: Optional[Callable[[EpochRecord], None]] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        self._islands: List[GeneticAlgorithm[C]] = islands
+        self._threshold: float = threshold
+        self._max_generations: int = max_generations
+        self._migration_interval: int = migration_interval
+        self._migration_size: int = migration_size
+        self._topology: Topology = topology
+        self._workers: Optional[int] = workers
+        self._telemetry: Optional[Callable[[EpochRecord], None]] = telemetry
+        self._rng: random.Random = rng if rng is not None else random.Random()
+
+    def _destinations(self) -> List[int]:
+        size = len(self._islands)
+        if self._topology == Topology.RING:
+            return [(i + 1) % size for i in range(size)]
+        return [self._rng.choice([j for j in range(size) if j != i]) for i in range(size)]
+
+    def _migrate(self) -> None:
+        emigrants = [copy.deepcopy(island.elites(self._migration_size)) for island in self._islands]
+        for source, destination in enumerate(self._destinations()):
+            self._islands[destination].immigrate(emigrants[source])
+
+    def run(self) -> C:
+        best: Optional[C] = None
+        stop_event = multiprocessing.Event()
+        with ProcessPoolExecutor(
+            max_workers=self._workers or len(self._islands), initializer=init_worker, initargs=(stop_event,)
+        ) as executor:
+            for generation in range(0, self._max_generations, self._migration_interval):
+                generations = min(self._migration_interval, self._max_generations - generation)
+                size = len(self._islands)
+                results = list(executor.map(_run_epoch, self._islands, [generations] * size, [self._threshold] * size))
+                self._islands = [island for island, _ in results]
+                for _, island_best in results:
+                    if best is None or island_best.fitness() > best.fitness():
+                        best = island_best
+                assert best is not None
+                if self._telemetry is not None:
+                    self._telemetry(
+                        EpochRecord(
+                            generation=max(island.generations for island in self._islands),
+                            best=best.fitness(),
+                            island_bests=tuple(island_best.fitness() for _, island_best in results),
+                        )
+                    )
+                if best.fitness() >= self._threshold:
+                    break
+                if len(self._islands) > 1:
+                    self._migrate()
+        assert best is not None
+        return best
+
+
+def main() -> None:
+    threshold = 9 * 9 * 3
+    max_generations = 2000
+    rng = random.Random(int(sys.argv[sys.argv.index("--seed") + 1]) if "--seed" in sys.argv else None)
+    start = time.perf_counter()
+    (single_rng,) = derive_rngs(rng, 1)
+    single: GeneticAlgorithm[SudokuChromosome] = GeneticAlgorithm(
+        initial_population=[SudokuChromosome.random_instance(single_rng) for _ in range(20)],
+        threshold=threshold,
+        mutation_chance=0.05,
+        max_generations=max_generations,
+        rng=single_rng,
+    )
+    single_best = single.run()
+    print(f"single\tfitness: {single_best.fitness()}\t{time.perf_counter() - start:.2f} s")
+    start = time.perf_counter()
+    configurations = [
+        (selection_type, mutation_chance) for selection_type in SelectionType for mutation_chance in [0.05, 0.2]
+    ]
+    islands: List[GeneticAlgorithm[SudokuChromosome]] = [
+        GeneticAlgorithm(
+            initial_population=[SudokuChromosome.random_instance(island_rng) for _ in range(20)],
+            threshold=threshold,
+            mutation_chance=mutation_chance,
+            selection_type=selection_type,
+            rng=island_rng,
+        )
+        for (selection_type, mutation_chance), island_rng in zip(configurations, derive_rngs(rng, len(configurations)))
+    ]
+    model = IslandModel(
+        islands,
+        threshold,
+        max_generations=max_generations,
+        migration_interval=100,
+        telemetry=lambda record: print(f"{record.generation}\t{record.best}"),
+        rng=rng,
+    )
+    island_best = model.run()
+    print(f"islands\tfitness: {island_best.fitness()}\t{time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,47 @@
 import functools
+import itertools
 import random
-from typing import List, Tuple
+import sys
+from typing import Any, List, Set, Tuple, Type
+
+import numpy as np
 
 from src.genetic import Chromosome, GeneticAlgorithm
-from src.sudoku import Sudoku, convert_sudoku_text
+from src.genetic_array import ArrayChromosome, ArrayGeneticAlgorithm
+from src.genetic_telemetry import ProgressPrinter
+from src.sudoku import Sudoku, convert_sudoku_text, parse_sudoku_line
+
+_PUZZLE = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
 
 
 def main() -> None:
-    initial_population: List[SudokuChromosome] = [SudokuChromosome.random_instance() for _ in range(20)]
-    algorithm: GeneticAlgorithm[SudokuChromosome] = GeneticAlgorithm(
+    seed = int(sys.argv[sys.argv.index("--seed") + 1]) if "--seed" in sys.argv else None
+    if "--array" in sys.argv:
+        array_algorithm: ArrayGeneticAlgorithm[SudokuChromosome] = ArrayGeneticAlgorithm(
+            SudokuChromosome,
+            population_size=10000,
+            threshold=9 * 9 * 3,
+            mutation_chance=0.05,
+            max_generations=100000,
+            telemetry=ProgressPrinter(),
+            rng=np.random.default_rng(seed),
+        )
+        print(array_algorithm.run())
+        return
+    rng = random.Random(seed)
+    puzzle = sys.argv[sys.argv.index("--puzzle") + 1] if "--puzzle" in sys.argv else _PUZZLE
+    chromosome_type = PermutationSudokuChromosome.for_puzzle(puzzle)
+    initial_population: List[PermutationSudokuChromosome] = [chromosome_type.random_instance(rng) for _ in range(100)]
+    algorithm: GeneticAlgorithm[PermutationSudokuChromosome] = GeneticAlgorithm(
         initial_population=initial_population,
         threshold=9 * 9 * 3,
-        mutation_chance=0.05,
+        mutation_chance=0.9,
         max_generations=100000,
+        elitism=2,
+        stagnation_limit=40,
+        reseed_fraction=1.0,
+        telemetry=ProgressPrinter(),
+        rng=rng,
     )
     result = algorithm.run()
     print(result)
@@ -43,7 +72,51 @@ def _get_constraint_ranges() -> List[List[int]]:
     ]
 
 
-class SudokuChromosome(Chromosome):
+@functools.lru_cache()
+def _get_block_indices() -> List[int]:
+    return [row // 3 * 3 + col // 3 for row in range(9) for col in range(9)]
+
+
+@functools.lru_cache()
+def _get_constraint_array() -> np.ndarray:
+    return np.array(_get_constraint_ranges())
+
+
+@functools.lru_cache()
+def _get_free_indices(clues: Tuple[int, ...]) -> List[List[int]]:
+    return [[i for i in row if clues[i] == 0] for row in _get_row_ranges()]
+
+
+@functools.lru_cache()
+def _get_allowed(clues: Tuple[int, ...]) -> List[Set[int]]:
+    allowed: List[Set[int]] = []
+    for index in range(81):
+        units = (_get_col_ranges()[index % 9], _get_block_ranges()[_get_block_indices()[index]])
+        allowed.append(set(range(1, 10)) - {clues[i] for unit in units for i in unit})
+    return allowed
+
+
+def _random_row(free_indices: List[int], missing: List[int], allowed: List[Set[int]], rng: random.Random) -> List[int]:
+    row: List[int] = []
+
+    def extend(remaining: List[int]) -> bool:
+        if len(remaining) == 0:
+            return True
+        candidates = [digit for digit in remaining if digit in allowed[free_indices[len(row)]]]
+        rng.shuffle(candidates)
+        for digit in candidates:
+            row.append(digit)
+            if extend([x for x in remaining if x != digit]):
+                return True
+            row.pop()
+        return False
+
+    if len(missing) != len(free_indices) or not extend(missing):
+        raise ValueError(f"no valid row for cells {free_indices}")
+    return row
+
+
+class SudokuChromosome(ArrayChromosome):
     def __init__(self, values: Sudoku) -> None:
         assert len(values) == 81
         self.values: Sudoku = values
@@ -56,13 +129,13 @@ class SudokuChromosome(Chromosome):
         return result
 
     @classmethod
-    def random_instance(cls) -> "SudokuChromosome":
+    def random_instance(cls, rng: random.Random) -> "SudokuChromosome":
         candidates = [i for _ in range(9) for i in range(1, 10)]
-        random.shuffle(candidates)
+        rng.shuffle(candidates)
         return SudokuChromosome(candidates)
 
-    def crossover(self, other: "SudokuChromosome") -> Tuple["SudokuChromosome", "SudokuChromosome"]:
-        left_partition, right_partition = sorted(random.sample(range(81), k=2))
+    def crossover(self, other: "SudokuChromosome", rng: random.Random) -> Tuple["SudokuChromosome", "SudokuChromosome"]:
+        left_partition, right_partition = sorted(rng.sample(range(81), k=2))
         assert left_partition < right_partition
         child_values1: Sudoku = [
             *self.values[:left_partition],
@@ -77,7 +150,7 @@ class SudokuChromosome(Chromosome):
         assert sum(child_values1) + sum(child_values2) == sum(self.values) + sum(other.values)
         return SudokuChromosome(child_values1), SudokuChromosome(child_values2)
 
-    def mutate(self) -> "SudokuChromosome":
+    def mutate(self, rng: random.Random) -> "SudokuChromosome":
         candidates = list(range(1, 10))
         times = {i: 0 for i in candidates}
         for value in self.values:
@@ -85,11 +158,148 @@ class SudokuChromosome(Chromosome):
         new_value = sorted(candidates, key=lambda x: times[x])[0]
         assert times[new_value] <= 9
         mutated_values: Sudoku = [*self.values]
-        mutated_values[random.choice(range(81))] = new_value
+        mutated_values[rng.choice(range(81))] = new_value
         return SudokuChromosome(mutated_values)
 
+    @classmethod
+    def random_genomes(cls, size: int, rng: np.random.Generator) -> np.ndarray:
+        return rng.permuted(np.tile(np.repeat(np.arange(1, 10, dtype=np.int8), 9), (size, 1)), axis=1)
+
+    @classmethod
+    def batch_fitness(cls, genomes: np.ndarray) -> np.ndarray:
+        units = np.sort(genomes[:, _get_constraint_array()], axis=2)
+        return (1 + (np.diff(units, axis=2) != 0).sum(axis=2)).sum(axis=1)
+
+    @classmethod
+    def batch_mutate(cls, genomes: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        mutated = genomes.copy()
+        times = np.stack([(genomes == digit).sum(axis=1) for digit in range(1, 10)], axis=1)
+        mutated[np.arange(len(genomes)), rng.integers(81, size=len(genomes))] = np.argmin(times, axis=1) + 1
+        return mutated
+
+    @classmethod
+    def from_genome(cls, genome: np.ndarray) -> "SudokuChromosome":
+        return SudokuChromosome([int(value) for value in genome])
+
     def __str__(self) -> str:
         return f"{convert_sudoku_text(self.values)}\nFitness: {self.fitness()}"
 
 
-main()
+class PermutationSudokuChromosome(Chromosome):
+    clues: Tuple[int, ...] = tuple(parse_sudoku_line(_PUZZLE))
+
+    def __init__(self, values: Sudoku, col_counts: List[int], block_counts: List[int], score: int) -> None:
+        assert len(values) == 81
+        self.values: Sudoku = values
+        self._col_counts: List[int] = col_counts
+        self._block_counts: List[int] = block_counts
+        self._score: int = score
+
+    @classmethod
+    def from_values(cls, values: Sudoku) -> "PermutationSudokuChromosome":
+        chromosome = cls(values, [0] * 90, [0] * 90, 81)
+        for index, value in enumerate(values):
+            chromosome._count(index, value, 1)
+        return chromosome
+
+    @classmethod
+    def for_puzzle(cls, line: str) -> Type["PermutationSudokuChromosome"]:
+        return _puzzle_type(cls, tuple(parse_sudoku_line(line)))
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        base = vars(type(self)).get("_base", type(self))
+        return _restore, (base, self.clues, self.values, self._col_counts, self._block_counts, self._score)
+
+    def _count(self, index: int, value: int, delta: int) -> None:
+        for counts, unit in (
+            (self._col_counts, index % 9),
+            (self._block_counts, _get_block_indices()[index]),
+        ):
+            before = counts[unit * 10 + value]
+            counts[unit * 10 + value] = before + delta
+            if before == 0 and delta > 0:
+                self._score += 1
+            elif before == 1 and delta < 0:
+                self._score -= 1
+
+    def _conflicted(self, index: int) -> bool:
+        value = self.values[index]
+        return (
+            self._col_counts[index % 9 * 10 + value] > 1
+            or self._block_counts[_get_block_indices()[index] * 10 + value] > 1
+        )
+
+    def _copy(self) -> "PermutationSudokuChromosome":
+        return type(self)([*self.values], [*self._col_counts], [*self._block_counts], self._score)
+
+    def _replace_row(self, row: int, source: "PermutationSudokuChromosome") -> None:
+        for index in _get_free_indices(self.clues)[row]:
+            if self.values[index] != source.values[index]:
+                self._count(index, self.values[index], -1)
+                self._count(index, source.values[index], 1)
+                self.values[index] = source.values[index]
+
+    def fitness(self) -> float:
+        return self._score
+
+    @classmethod
+    def random_instance(cls, rng: random.Random) -> "PermutationSudokuChromosome":
+        values: Sudoku = [*cls.clues]
+        allowed = _get_allowed(cls.clues)
+        for row, free_indices in zip(_get_row_ranges(), _get_free_indices(cls.clues)):
+            missing = [digit for digit in range(1, 10) if digit not in {values[i] for i in row}]
+            for index, digit in zip(free_indices, _random_row(free_indices, missing, allowed, rng)):
+                values[index] = digit
+        return cls.from_values(values)
+
+    def crossover(
+        self, other: "PermutationSudokuChromosome", rng: random.Random
+    ) -> Tuple["PermutationSudokuChromosome", "PermutationSudokuChromosome"]:
+        child1, child2 = self._copy(), other._copy()
+        for row in range(9):
+            if rng.random() < 0.5:
+                child1._replace_row(row, other)
+                child2._replace_row(row, self)
+        return child1, child2
+
+    def mutate(self, rng: random.Random) -> "PermutationSudokuChromosome":
+        mutated = self._copy()
+        allowed = _get_allowed(self.clues)
+        swaps = [
+            (first, second)
+            for free_indices in _get_free_indices(self.clues)
+            for first, second in itertools.combinations(free_indices, 2)
+            if self.values[second] in allowed[first]
+            and self.values[first] in allowed[second]
+            and (self._conflicted(first) or self._conflicted(second))
+        ]
+        if not swaps:
+            return mutated
+        first, second = rng.choice(swaps)
+        first_value, second_value = mutated.values[first], mutated.values[second]
+        mutated._count(first, first_value, -1)
+        mutated._count(second, second_value, -1)
+        mutated._count(first, second_value, 1)
+        mutated._count(second, first_value, 1)
+        mutated.values[first], mutated.values[second] = second_value, first_value
+        return mutated
+
+    def __str__(self) -> str:
+        return f"{convert_sudoku_text(self.values)}\nFitness: {self.fitness()}"
+
+
+@functools.lru_cache()
+def _puzzle_type(base: Type[PermutationSudokuChromosome], clues: Tuple[int, ...]) -> Type[PermutationSudokuChromosome]:
+    if clues == base.clues:
+        return base
+    return type(base.__name__, (base,), {"__module__": base.__module__, "clues": clues, "_base": base})
+
+
+def _restore(
+    base: Type[PermutationSudokuChromosome], clues: Tuple[int, ...], *state: Any
+) -> PermutationSudokuChromosome:
+    return _puzzle_type(base, clues)(*state)
+
+
+if __name__ == "__main__":
+    main()
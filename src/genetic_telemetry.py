@@ -0,0 +1,71 @@
+import csv
+import json
+from dataclasses import asdict, dataclass, fields
+from typing import IO, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class GenerationRecord:
+    generation: int
+    best: float
+    mean: float
+    diversity: float
+    evaluations: int
+    selection_time: float
+    crossover_time: float
+    mutation_time: float
+    evaluation_time: float
+
+
+@dataclass(frozen=True)
+class EpochRecord:
+    generation: int
+    best: float
+    island_bests: Tuple[float, ...]
+
+
+class ProgressPrinter:
+    def __init__(self, interval: int = 100):
+        self._interval = interval
+
+    def __call__(self, record: GenerationRecord) -> None:
+        if record.generation % self._interval == 0:
+            print(f"{record.generation}\t{record.best}\t{record.mean}\t{record.evaluations}")
+
+
+class JsonlSink:
+    def __init__(self, path: str):
+        self._file: IO[str] = open(path, "w")
+
+    def __call__(self, record: GenerationRecord) -> None:
+        self._file.write(json.dumps(asdict(record)) + "\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "JsonlSink":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+
+class CsvSink:
+    def __init__(self, path: str):
+        self._file: IO[str] = open(path, "w", newline="")
+        self._writer: Optional["csv.DictWriter[str]"] = None
+
+    def __call__(self, record: GenerationRecord) -> None:
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=[field.name for field in fields(record)])
+            self._writer.writeheader()
+        self._writer.writerow(asdict(record))
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "CsvSink":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
@@ -0,0 +1,143 @@
+import csv
+import functools
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+_DATA_DIRECTORY = "data"
+_CACHE_DIRECTORY = ".cache"
+INDICATOR_NAMES = ["gdp", "co2", "dyn", "gdp-growth"]
+
+
+@dataclass(frozen=True)
+class Indicator:
+    name: str
+    country_codes: np.ndarray
+    country_names: np.ndarray
+    years: np.ndarray
+    values: np.ndarray
+
+    @property
+    def mask(self) -> np.ndarray:
+        return ~np.isnan(self.values)
+
+    @functools.cached_property
+    def _rows(self) -> Dict[str, int]:
+        return {code: row for row, code in enumerate(self.country_codes.tolist())}
+
+    def year_index(self, year: int) -> int:
+        index = int(np.searchsorted(self.years, year))
+        if index == len(self.years) or self.years[index] != year:
+            raise LookupError(year)
+        return index
+
+    def rows(self, country_codes: Iterable[str]) -> np.ndarray:
+        return np.array([self._rows[code] for code in country_codes], dtype=np.intp)
+
+    def select(self, year: int) -> np.ndarray:
+        return self.values[:, self.year_index(year)]
+
+
+@dataclass(frozen=True)
+class IndicatorTable:
+    country_codes: np.ndarray
+    country_names: np.ndarray
+    values: np.ndarray
+
+
+def _parse_csv(path: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    with open(path, encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        year_columns = [i for i, column in enumerate(header) if column.isdigit()]
+        rows = [row for row in reader if len(row) > year_columns[-1]]
+    values = np.array(
+        [[float(row[i]) if len(row[i]) > 0 else np.nan for i in year_columns] for row in rows], dtype=float
+    )
+    return (
+        np.array([row[1] for row in rows]),
+        np.array([row[0] for row in rows]),
+        np.array([int(header[i]) for i in year_columns]),
+        values,
+    )
+
+
+def _cache_paths(directory: str, name: str, mtime: int) -> Tuple[str, str]:
+    key = os.path.join(directory, _CACHE_DIRECTORY, f"{name}-{mtime}")
+    return f"{key}.npy", f"{key}-labels.npz"
+
+
+def _write_cache(directory: str, name: str, paths: Tuple[str, str], indicator: Indicator) -> None:
+    cache_directory = os.path.join(directory, _CACHE_DIRECTORY)
+    os.makedirs(cache_directory, exist_ok=True)
+    for entry in os.listdir(cache_directory):
+        if re.fullmatch(rf"{re.escape(name)}-\d+(-labels\.npz|\.npy)", entry):
+            os.remove(os.path.join(cache_directory, entry))
+    values_path, labels_path = paths
+    with open(f"{values_path}.tmp", "wb") as f:
+        np.save(f, indicator.values)
+    with open(f"{labels_path}.tmp", "wb") as f:
+        np.savez(f, country_codes=indicator.country_codes, country_names=indicator.country_names, years=indicator.years)
+    os.replace(f"{labels_path}.tmp", labels_path)
+    os.replace(f"{values_path}.tmp", values_path)
+
+
+def load_indicator(name: str, directory: str = _DATA_DIRECTORY) -> Indicator:
+    path = os.path.join(directory, f"{name}.csv")
+    paths = _cache_paths(directory, name, os.stat(path).st_mtime_ns)
+    values_path, labels_path = paths
+    if os.path.exists(values_path) and os.path.exists(labels_path):
+        with np.load(labels_path) as labels:
+            return Indicator(
+                name,
+                labels["country_codes"],
+                labels["country_names"],
+                labels["years"],
+                np.load(values_path, mmap_mode="r"),
+            )
+    indicator = Indicator(name, *_parse_csv(path))
+    _write_cache(directory, name, paths, indicator)
+    return indicator
+
+
+def join_indicators(columns: Sequence[Tuple[Indicator, int]], exclude: Iterable[str] = ()) -> IndicatorTable:
+    excluded = set(exclude)
+    codes = set(columns[0][0].country_codes.tolist())
+    for indicator, _ in columns[1:]:
+        codes &= set(indicator.country_codes.tolist())
+    country_codes = sorted(codes - excluded)
+    values = np.column_stack([indicator.select(year)[indicator.rows(country_codes)] for indicator, year in columns])
+    present = ~np.isnan(values).any(axis=1)
+    first = columns[0][0]
+    return IndicatorTable(
+        np.array(country_codes)[present],
+        first.country_names[first.rows(country_codes)][present],
+        values[present],
+    )
+
+
+def main() -> None:
+    for name in INDICATOR_NAMES:
+        path = os.path.join(_DATA_DIRECTORY, f"{name}.csv")
+        start = time.perf_counter()
+        Indicator(name, *_parse_csv(path))
+        parse_time = time.perf_counter() - start
+        load_indicator(name)
+        start = time.perf_counter()
+        indicator = load_indicator(name)
+        load_time = time.perf_counter() - start
+        print(
+            f"{name}\t{indicator.values.shape}\tpresent: {indicator.mask.mean():.0%}"
+            f"\tparse: {parse_time * 1000:.1f} ms\tcached: {load_time * 1000:.1f} ms"
+        )
+    indicators: List[Indicator] = [load_indicator(name) for name in INDICATOR_NAMES]
+    table = join_indicators([(indicator, 2018) for indicator in indicators], exclude=["WLD"])
+    print(f"joined 2018: {len(table.country_codes)} countries")
+
+
+if __name__ == "__main__":
+    main()
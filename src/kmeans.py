@@ -1,9 +1,26 @@
-import functools
+import itertools
 import math
 import random
 import statistics
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Generic, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+from enum import Enum
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from src.kmeans_point import Point
+from src.kmeans_store import PointStore
+from src.random_streams import derive_rngs
 
 
 def calc_z_scores(original: Sequence[float]) -> List[float]:
@@ -14,28 +31,18 @@ def calc_z_scores(original: Sequence[float]) -> List[float]:
     return [(x - avg) / std for x in original]
 
 
-class DataPoint:
+class DataPoint(Point):
+    __slots__ = ("_originals", "dimensions")
+
     def __init__(self, original: Iterable[float]):
         self._originals: Tuple[float, ...] = tuple(original)
         self.dimensions: Tuple[float, ...] = tuple(original)
 
-    @property
-    def num_dimensions(self) -> int:
-        return len(self.dimensions)
-
-    def distance(self, other: "DataPoint") -> float:
-        combined: Iterator[Tuple[float, float]] = zip(self.dimensions, other.dimensions)
-        differences = [(x - y) ** 2 for x, y in combined]
-        return math.sqrt(sum(differences))
-
-    def __eq__(self, other: object) -> bool:
-        return isinstance(other, DataPoint) and self.dimensions == other.dimensions
-
     def __repr__(self) -> str:
         return self._originals.__repr__()
 
 
-P = TypeVar("P", bound=DataPoint)
+P = TypeVar("P", bound=Point)
 
 
 @dataclass(frozen=True)
@@ -43,80 +50,297 @@ class Cluster(Generic[P]):
     points: Tuple[P, ...]
     centroid: Optional[DataPoint]
 
+    @property
+    def inertia(self) -> float:
+        if self.centroid is None:
+            return 0.0
+        return sum(point.distance(self.centroid) ** 2 for point in self.points)
+
+
+def calc_inertia(clusters: Iterable[Cluster[P]]) -> float:
+    return sum(cluster.inertia for cluster in clusters)
+
+
+@dataclass(frozen=True)
+class IterationRecord:
+    centroids: Tuple[Optional[Tuple[float, ...]], ...]
+    changes: Dict[int, int]
+    inertia: float
+    moved: int
+
+
+@dataclass(frozen=True)
+class KMeansResult(Generic[P]):
+    clusters: List[Cluster[P]]
+    labels: List[int]
+    history: List[IterationRecord]
+
+    @property
+    def inertia(self) -> float:
+        return self.history[-1].inertia
+
+    @property
+    def iterations(self) -> int:
+        return len(self.history) - 1
+
+
+def replay_labels(history: Iterable[IterationRecord]) -> Iterator[List[int]]:
+    labels: List[int] = []
+    for record in history:
+        if not labels:
+            labels = [0] * len(record.changes)
+        for index, label in record.changes.items():
+            labels[index] = label
+        yield [*labels]
+
+
+def _centroid_tuples(centroids: Sequence[Optional[DataPoint]]) -> Tuple[Optional[Tuple[float, ...]], ...]:
+    return tuple(None if centroid is None else centroid.dimensions for centroid in centroids)
+
+
+class Initialization(Enum):
+    RANDOM = 1
+    PLUS_PLUS = 2
+
+
+class Assignment(Enum):
+    BRUTE_FORCE = 1
+    HAMERLY = 2
+
+
+_k_means: Optional["KMeans[Any]"] = None
+
+
+def _init_worker(k_means: "KMeans[Any]") -> None:
+    global _k_means
+    _k_means = k_means
+
+
+def _run_restart(k: int, max_iterations: int, tolerance: float, rng: random.Random) -> "KMeansResult[Any]":
+    assert _k_means is not None
+    _k_means._rng = rng
+    return _k_means.fit(k, max_iterations, tolerance)
+
+
+def _centroid_shift(first: Optional[DataPoint], second: Optional[DataPoint]) -> float:
+    if first is None or second is None:
+        return 0.0 if first is second else math.inf
+    return first.distance(second)
+
 
 class KMeans(Generic[P]):
     points: Tuple[P, ...]
 
-    def __init__(self, points: List[P]):
+    def __init__(
+        self,
+        points: Sequence[P],
+        rng: Optional[random.Random] = None,
+        initialization: Initialization = Initialization.PLUS_PLUS,
+        assignment: Assignment = Assignment.BRUTE_FORCE,
+    ):
         self._points = points
-        self._normalize_z_score()
+        self._rng: random.Random = rng if rng is not None else random.Random()
+        self._initialization: Initialization = initialization
+        self._assignment: Assignment = assignment
+        self.distance_evaluations: int = 0
+        self._vectors: Sequence[Point] = self._normalize_z_score()
 
     def _slice_dimension(self, dimension: int) -> List[float]:
-        return [x.dimensions[dimension] for x in self._points]
+        return [x.dimensions[dimension] for x in self._vectors]
 
-    def _normalize_z_score(self) -> None:
+    def _normalize_z_score(self) -> Sequence[Point]:
+        if isinstance(self._points, PointStore):
+            return self._points
         z_scores: List[List[float]] = [[] for _ in range(len(self._points))]
         for dimension in range(self._points[0].num_dimensions):
-            dimension_slice = self._slice_dimension(dimension)
+            dimension_slice = [x.dimensions[dimension] for x in self._points]
             for index, z_score in enumerate(calc_z_scores(dimension_slice)):
                 z_scores[index].append(z_score)
-        for i in range(len(self._points)):
-            self._points[i].dimensions = tuple(z_scores[i])
+        data_points = [point for point in self._points if isinstance(point, DataPoint)]
+        if len(data_points) < len(self._points):
+            # Views into a PointStore are read-only, so a subset of them is normalized into points owned here.
+            return [DataPoint(dimensions) for dimensions in z_scores]
+        for point, dimensions in zip(data_points, z_scores):
+            point.dimensions = tuple(dimensions)
+        return data_points
 
     def _generate_random_point(self) -> DataPoint:
         rand_dimensions: List[float] = []
         for dimension in range(self._points[0].num_dimensions):
             values = self._slice_dimension(dimension)
-            rand_value = random.uniform(min(values), max(values))
+            rand_value = self._rng.uniform(min(values), max(values))
             rand_dimensions.append(rand_value)
         return DataPoint(rand_dimensions)
 
-    def _generate_next_cluster_points(self, k: int, centroids: Sequence[Optional[DataPoint]]) -> List[List[P]]:
+    def _generate_plus_plus_centroids(self, k: int) -> List[DataPoint]:
+        centroids: List[DataPoint] = [DataPoint(self._rng.choice(self._vectors).dimensions)]
+        squared_distances = [point.distance(centroids[0]) ** 2 for point in self._vectors]
+        for _ in range(1, k):
+            if sum(squared_distances) == 0:
+                break
+            centroid = DataPoint(self._rng.choices(self._vectors, weights=squared_distances)[0].dimensions)
+            centroids.append(centroid)
+            squared_distances = [
+                min(d, point.distance(centroid) ** 2) for d, point in zip(squared_distances, self._vectors)
+            ]
+        return centroids
+
+    def _generate_initial_centroids(self, k: int) -> List[DataPoint]:
+        if self._initialization == Initialization.PLUS_PLUS:
+            return self._generate_plus_plus_centroids(k)
+        return [self._generate_random_point() for _ in range(k)]
+
+    def _generate_next_cluster_indices(self, k: int, centroids: Sequence[Optional[DataPoint]]) -> List[List[int]]:
         not_empty_centroids = [x for x in centroids if x is not None]
-        next_cluster_points: List[List[P]] = [[] for _ in range(k)]
-        for point in self._points:
-            closest = min(not_empty_centroids, key=functools.partial(DataPoint.distance, point))
+        next_cluster_indices: List[List[int]] = [[] for _ in range(k)]
+        for index, vector in enumerate(self._vectors):
+            closest = min(not_empty_centroids, key=vector.distance)
             i = centroids.index(closest)
-            next_cluster_points[i].append(point)
-        return next_cluster_points
+            next_cluster_indices[i].append(index)
+        return next_cluster_indices
 
-    def _generate_next_centroid(self, next_points: Sequence[P]) -> Optional[DataPoint]:
+    def _generate_next_centroid(self, next_points: Sequence[Point]) -> Optional[DataPoint]:
         if len(next_points) == 0:
             return None
-        means: List[float] = []
-        for dimension in range(next_points[0].num_dimensions):
-            dimension_slice = [p.dimensions[dimension] for p in next_points]
-            means.append(statistics.mean(dimension_slice))
-        return DataPoint(means)
+        columns = zip(*(p.dimensions for p in next_points))
+        return DataPoint([statistics.mean(dimension_slice) for dimension_slice in columns])
 
-    def _generate_next_centroids(self, next_cluster_points: Sequence[Sequence[P]]) -> List[Optional[DataPoint]]:
-        return [self._generate_next_centroid(next_points) for next_points in next_cluster_points]
+    def _generate_next_centroids(self, cluster_indices: Sequence[Sequence[int]]) -> List[Optional[DataPoint]]:
+        return [self._generate_next_centroid([self._vectors[i] for i in indices]) for indices in cluster_indices]
 
-    def run(self, k: int, max_iterations: int = 100) -> List[List[Cluster]]:
-        initial_centroids: List[DataPoint] = [self._generate_random_point() for _ in range(k)]
-        initial_cluster_points: List[List[P]] = self._generate_next_cluster_points(k, initial_centroids)
-        initial_clusters: List[Cluster[P]] = [
-            Cluster(tuple(points), centroid) for centroid, points in zip(initial_centroids, initial_cluster_points)
+    def _build_clusters(
+        self, cluster_indices: Sequence[Sequence[int]], centroids: Sequence[Optional[DataPoint]]
+    ) -> List[Cluster[P]]:
+        return [
+            Cluster(tuple(self._points[i] for i in indices), centroid)
+            for indices, centroid in zip(cluster_indices, centroids)
         ]
-        cluster_histories = [initial_clusters]
+
+    def _nearest_two(self, point: Point, live: Sequence[Tuple[int, DataPoint]]) -> Tuple[int, float, float]:
+        label, nearest, second = -1, math.inf, math.inf
+        for i, centroid in live:
+            distance = point.distance(centroid)
+            if distance < nearest:
+                label, nearest, second = i, distance, nearest
+            elif distance < second:
+                second = distance
+        self.distance_evaluations += len(live)
+        return label, nearest, second
+
+    def _assign_labels(self, centroids: Sequence[Optional[DataPoint]]) -> Tuple[List[int], List[float], List[float]]:
+        live = [(i, centroid) for i, centroid in enumerate(centroids) if centroid is not None]
+        labels: List[int] = []
+        upper: List[float] = []
+        lower: List[float] = []
+        for point in self._vectors:
+            label, nearest, second = self._nearest_two(point, live)
+            labels.append(label)
+            upper.append(nearest)
+            lower.append(second)
+        return labels, upper, lower
+
+    def _assign_labels_hamerly(
+        self,
+        centroids: Sequence[Optional[DataPoint]],
+        next_centroids: Sequence[Optional[DataPoint]],
+        labels: Sequence[int],
+        lower: Sequence[float],
+    ) -> Tuple[List[int], List[float], List[float]]:
+        live = [(i, centroid) for i, centroid in enumerate(next_centroids) if centroid is not None]
+        max_shift = max(_centroid_shift(x, y) for x, y in zip(centroids, next_centroids) if y is not None)
+        half_gaps: List[float] = [math.inf] * len(next_centroids)
+        for (i, first_centroid), (j, second_centroid) in itertools.combinations(live, 2):
+            half_gap = first_centroid.distance(second_centroid) / 2
+            half_gaps[i] = min(half_gaps[i], half_gap)
+            half_gaps[j] = min(half_gaps[j], half_gap)
+        self.distance_evaluations += len(live) + len(live) * (len(live) - 1) // 2
+        next_labels: List[int] = []
+        next_upper: List[float] = []
+        next_lower: List[float] = []
+        for point, label, bound in zip(self._vectors, labels, lower):
+            centroid = next_centroids[label]
+            assert centroid is not None
+            distance = point.distance(centroid)
+            self.distance_evaluations += 1
+            bound -= max_shift
+            if distance < max(half_gaps[label], bound):
+                next_labels.append(label)
+                next_upper.append(distance)
+                next_lower.append(bound)
+                continue
+            label, nearest, second = self._nearest_two(point, live)
+            next_labels.append(label)
+            next_upper.append(nearest)
+            next_lower.append(second)
+        return next_labels, next_upper, next_lower
+
+    def _group_indices(self, labels: Sequence[int], k: int) -> List[List[int]]:
+        groups: List[List[int]] = [[] for _ in range(k)]
+        for index, label in enumerate(labels):
+            groups[label].append(index)
+        return groups
+
+    def fit(self, k: int, max_iterations: int = 100, tolerance: float = 0.0) -> KMeansResult[P]:
+        centroids: List[Optional[DataPoint]] = [*self._generate_initial_centroids(k)]
+        labels, upper, lower = self._assign_labels(centroids)
+        inertia = sum(distance**2 for distance in upper)
+        history = [IterationRecord(_centroid_tuples(centroids), dict(enumerate(labels)), inertia, len(labels))]
+        for _ in range(max_iterations):
+            next_centroids = self._generate_next_centroids(self._group_indices(labels, len(centroids)))
+            if self._assignment == Assignment.HAMERLY:
+                next_labels, upper, lower = self._assign_labels_hamerly(centroids, next_centroids, labels, lower)
+            else:
+                next_labels, upper, lower = self._assign_labels(next_centroids)
+            inertia = sum(distance**2 for distance in upper)
+            changes = {i: label for i, (label, old) in enumerate(zip(next_labels, labels)) if label != old}
+            history.append(IterationRecord(_centroid_tuples(next_centroids), changes, inertia, len(changes)))
+            shift = max(_centroid_shift(x, y) for x, y in zip(centroids, next_centroids))
+            centroids, labels = next_centroids, next_labels
+            if len(changes) == 0 or shift <= tolerance:
+                break
+        return KMeansResult(
+            self._build_clusters(self._group_indices(labels, len(centroids)), centroids), labels, history
+        )
+
+    def run(self, k: int, max_iterations: int = 100) -> List[List[Cluster]]:
+        initial_centroids: List[DataPoint] = self._generate_initial_centroids(k)
+        cluster_indices = self._generate_next_cluster_indices(len(initial_centroids), initial_centroids)
+        cluster_histories = [self._build_clusters(cluster_indices, initial_centroids)]
         for iteration in range(max_iterations):
-            next_centroids = self._generate_next_centroids([cluster.points for cluster in cluster_histories[-1]])
-            next_cluster_points = self._generate_next_cluster_points(k, next_centroids)
-            cluster_histories.append(
-                [Cluster(tuple(points), centroid) for points, centroid in zip(next_cluster_points, next_centroids)]
-            )
+            next_centroids = self._generate_next_centroids(cluster_indices)
+            cluster_indices = self._generate_next_cluster_indices(k, next_centroids)
+            cluster_histories.append(self._build_clusters(cluster_indices, next_centroids))
             is_stable = [x.centroid for x in cluster_histories[-1]] == [x.centroid for x in cluster_histories[-2]]
             if is_stable:
                 print(f"Converged after {iteration} iterations")
                 break
         return cluster_histories
 
+    def run_best(
+        self,
+        k: int,
+        n_init: int = 10,
+        max_iterations: int = 100,
+        tolerance: float = 0.0,
+        workers: Optional[int] = None,
+    ) -> KMeansResult[P]:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as executor:
+            runs = executor.map(
+                _run_restart,
+                [k] * n_init,
+                [max_iterations] * n_init,
+                [tolerance] * n_init,
+                derive_rngs(self._rng, n_init),
+            )
+            return min(runs, key=lambda result: result.inertia)
+
 
 def main() -> None:
     k_means = KMeans([DataPoint([2, 1, 1]), DataPoint([2, 2, 5]), DataPoint([3, 1.5, 2.5])])
-    clusters = k_means.run(2)[-1]
-    for index, cluster in enumerate(clusters):
+    result = k_means.fit(2)
+    for index, cluster in enumerate(result.clusters):
         print(f"Cluster {index}: {cluster.points}")
+    print(f"Converged after {result.iterations} iterations, inertia: {result.inertia}")
 
 
 if __name__ == "__main__":
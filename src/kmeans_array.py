@@ -0,0 +1,168 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Generic, List, Optional, Sequence, cast
+
+import numpy as np
+
+from src.kmeans import Cluster, DataPoint, Initialization, P
+from src.kmeans_store import PointStore, StoredPoint, calc_z_score_array
+from src.random_streams import derive_generators
+
+
+@dataclass(frozen=True)
+class ArrayClustering:
+    centroids: np.ndarray
+    labels: np.ndarray
+    iterations: int
+    inertia: float
+
+
+_k_means: Optional["ArrayKMeans[Any]"] = None
+
+
+def _init_worker(k_means: "ArrayKMeans[Any]") -> None:
+    global _k_means
+    _k_means = k_means
+
+
+def _run_restart(k: int, max_iterations: int, tolerance: float, rng: np.random.Generator) -> ArrayClustering:
+    assert _k_means is not None
+    _k_means._rng = rng
+    return _k_means.run(k, max_iterations, tolerance)
+
+
+class ArrayKMeans(Generic[P]):
+    def __init__(
+        self,
+        originals: np.ndarray,
+        points: Optional[Sequence[P]] = None,
+        rng: Optional[np.random.Generator] = None,
+        chunk_size: int = 65536,
+        initialization: Initialization = Initialization.PLUS_PLUS,
+        dimensions: Optional[np.ndarray] = None,
+    ):
+        self._originals: np.ndarray = np.asarray(originals, dtype=float)
+        self._points: Optional[Sequence[P]] = points
+        self._rng: np.random.Generator = rng if rng is not None else np.random.default_rng()
+        self._chunk_size: int = chunk_size
+        self._initialization: Initialization = initialization
+        self.dimensions: np.ndarray = calc_z_score_array(self._originals) if dimensions is None else dimensions
+        self._squared_norms: np.ndarray = np.einsum("ij,ij->i", self.dimensions, self.dimensions)
+
+    @classmethod
+    def from_points(cls, points: Sequence[P], rng: Optional[np.random.Generator] = None) -> "ArrayKMeans[P]":
+        return cls(np.array([point.dimensions for point in points], dtype=float), points, rng)
+
+    @classmethod
+    def from_store(cls, store: PointStore, rng: Optional[np.random.Generator] = None) -> "ArrayKMeans[StoredPoint]":
+        return ArrayKMeans(store.originals, store, rng, dimensions=store.dimensions)
+
+    def _generate_random_centroids(self, k: int) -> np.ndarray:
+        return self._rng.uniform(
+            self.dimensions.min(axis=0), self.dimensions.max(axis=0), size=(k, self.dimensions.shape[1])
+        )
+
+    def _generate_plus_plus_centroids(self, k: int) -> np.ndarray:
+        centroids = np.full((k, self.dimensions.shape[1]), np.nan)
+        centroids[0] = self.dimensions[self._rng.integers(len(self.dimensions))]
+        squared_distances = ((self.dimensions - centroids[0]) ** 2).sum(axis=1)
+        for i in range(1, k):
+            cumulative = np.cumsum(squared_distances)
+            if cumulative[-1] == 0:
+                break
+            centroids[i] = self.dimensions[
+                np.searchsorted(cumulative, self._rng.random() * cumulative[-1], side="right")
+            ]
+            np.minimum(squared_distances, ((self.dimensions - centroids[i]) ** 2).sum(axis=1), out=squared_distances)
+        return centroids
+
+    def _generate_initial_centroids(self, k: int) -> np.ndarray:
+        if self._initialization == Initialization.PLUS_PLUS:
+            return self._generate_plus_plus_centroids(k)
+        return self._generate_random_centroids(k)
+
+    def _inertia(self, centroids: np.ndarray, labels: np.ndarray) -> float:
+        return float(((self.dimensions - centroids[labels]) ** 2).sum())
+
+    def _assign(self, centroids: np.ndarray) -> np.ndarray:
+        alive = ~np.isnan(centroids[:, 0])
+        live_centroids = centroids[alive]
+        live_indices = np.flatnonzero(alive)
+        centroid_norms = np.einsum("ij,ij->i", live_centroids, live_centroids)
+        labels = np.empty(len(self.dimensions), dtype=np.intp)
+        for start in range(0, len(self.dimensions), self._chunk_size):
+            chunk = slice(start, start + self._chunk_size)
+            distances = (
+                self._squared_norms[chunk, None] - 2 * self.dimensions[chunk] @ live_centroids.T + centroid_norms
+            )
+            labels[chunk] = live_indices[np.argmin(distances, axis=1)]
+        return labels
+
+    def _update(self, labels: np.ndarray, k: int) -> np.ndarray:
+        counts = np.bincount(labels, minlength=k)
+        sums = np.stack(
+            [np.bincount(labels, weights=column, minlength=k) for column in self.dimensions.T],
+            axis=1,
+        )
+        centroids = np.full_like(sums, np.nan)
+        np.divide(sums, counts[:, None], out=centroids, where=counts[:, None] > 0)
+        return centroids
+
+    def run(self, k: int, max_iterations: int = 100, tolerance: float = 0.0) -> ArrayClustering:
+        centroids = self._generate_initial_centroids(k)
+        labels = self._assign(centroids)
+        for iteration in range(max_iterations):
+            next_centroids = self._update(labels, k)
+            next_labels = self._assign(next_centroids)
+            shifts = np.sqrt(((next_centroids - centroids) ** 2).sum(axis=1))
+            is_stable = np.array_equal(next_labels, labels) or bool(np.nanmax(shifts) <= tolerance)
+            centroids, labels = next_centroids, next_labels
+            if is_stable:
+                return ArrayClustering(centroids, labels, iteration + 1, self._inertia(centroids, labels))
+        return ArrayClustering(centroids, labels, max_iterations, self._inertia(centroids, labels))
+
+    def run_best(
+        self,
+        k: int,
+        n_init: int = 10,
+        max_iterations: int = 100,
+        tolerance: float = 0.0,
+        workers: Optional[int] = None,
+    ) -> ArrayClustering:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as executor:
+            runs = executor.map(
+                _run_restart,
+                [k] * n_init,
+                [max_iterations] * n_init,
+                [tolerance] * n_init,
+                derive_generators(self._rng, n_init),
+            )
+            return min(runs, key=lambda clustering: clustering.inertia)
+
+    def point(self, index: int) -> P:
+        if self._points is not None:
+            return self._points[index]
+        return cast(P, DataPoint(self._originals[index].tolist()))
+
+    def clusters(self, clustering: ArrayClustering) -> List[Cluster[P]]:
+        order = np.argsort(clustering.labels, kind="stable")
+        bounds = np.searchsorted(clustering.labels[order], np.arange(len(clustering.centroids) + 1))
+        return [
+            Cluster(
+                tuple(self.point(i) for i in order[bounds[label] : bounds[label + 1]]),
+                None if np.isnan(centroid[0]) else DataPoint(centroid.tolist()),
+            )
+            for label, centroid in enumerate(clustering.centroids)
+        ]
+
+
+def main() -> None:
+    k_means: ArrayKMeans[DataPoint] = ArrayKMeans(np.array([[2, 1, 1], [2, 2, 5], [3, 1.5, 2.5]]))
+    clustering = k_means.run(2)
+    for index, cluster in enumerate(k_means.clusters(clustering)):
+        print(f"Cluster {index}: {cluster.points}")
+    print(f"Inertia: {clustering.inertia}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import random
+import time
+import tracemalloc
+from typing import Iterator, List
+
+import numpy as np
+
+from src.kmeans import Assignment, DataPoint, Initialization, KMeans
+from src.kmeans_array import ArrayKMeans
+from src.kmeans_store import PointStore
+from src.kmeans_stream import MiniBatchKMeans
+
+
+def main() -> None:
+    _benchmark_array()
+    _benchmark_initialization()
+    _benchmark_stream()
+    _benchmark_hamerly()
+    _benchmark_store()
+
+
+def _generate_blobs(n: int, k: int, d: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.uniform(-10, 10, size=(k, d))
+    return centers[rng.integers(k, size=n)] + rng.normal(size=(n, d))
+
+
+def _benchmark_array() -> None:
+    k, d = 7, 2
+    rng = np.random.default_rng(0)
+    for n in [10**4, 10**5, 10**6]:
+        data = _generate_blobs(n, k, d, rng)
+        print(f"n = {n}")
+        if n <= 10**5:
+            points: List[DataPoint] = [DataPoint(row) for row in data.tolist()]
+            start = time.perf_counter()
+            histories = KMeans(points).run(k, max_iterations=3)
+            list_time = (time.perf_counter() - start) / (len(histories) - 1)
+            print(f"  list\titerations: {len(histories) - 1}\t{list_time * 1000:.1f} ms/iteration")
+        start = time.perf_counter()
+        clustering = ArrayKMeans(data, rng=rng).run(k)
+        array_time = (time.perf_counter() - start) / clustering.iterations
+        print(f"  array\titerations: {clustering.iterations}\t{array_time * 1000:.1f} ms/iteration", end="")
+        print(f"\tspeedup: {list_time / array_time:.0f}x" if n <= 10**5 else "")
+
+
+def _benchmark_initialization() -> None:
+    k, d, runs = 7, 2, 20
+    rng = np.random.default_rng(0)
+    data = _generate_blobs(10**5, k, d, rng)
+    print(f"n = {len(data)}, k = {k}, {runs} runs")
+    for initialization in Initialization:
+        k_means: ArrayKMeans[DataPoint] = ArrayKMeans(data, rng=rng, initialization=initialization)
+        clusterings = [k_means.run(k) for _ in range(runs)]
+        iterations = np.mean([clustering.iterations for clustering in clusterings])
+        empty = sum(int(np.isnan(clustering.centroids[:, 0]).sum()) for clustering in clusterings)
+        inertias = [clustering.inertia for clustering in clusterings]
+        print(
+            f"  {initialization.name}\titerations: {iterations:.1f}\tempty clusters: {empty}"
+            f"\tinertia: {np.mean(inertias):.0f} (best {min(inertias):.0f})"
+        )
+    k_means = ArrayKMeans(data, rng=rng)
+    start = time.perf_counter()
+    best = k_means.run_best(k, n_init=runs)
+    print(f"  run_best\tinertia: {best.inertia:.0f}\t{time.perf_counter() - start:.2f} s")
+
+
+def _generate_blob_batches(n: int, k: int, d: int, batch_size: int, rng: np.random.Generator) -> Iterator[np.ndarray]:
+    centers = np.random.default_rng(1).uniform(-10, 10, size=(k, d))
+    for start in range(0, n, batch_size):
+        size = min(batch_size, n - start)
+        yield centers[rng.integers(k, size=size)] + rng.normal(size=(size, d))
+
+
+def _benchmark_stream() -> None:
+    n, k, d, batch_size = 10**6, 7, 2, 4096
+    print(f"n = {n}, k = {k}, batch size = {batch_size}")
+    tracemalloc.start()
+    start = time.perf_counter()
+    stream = MiniBatchKMeans(k, d, rng=np.random.default_rng(0))
+    stream.fit(_generate_blob_batches(n, k, d, batch_size, np.random.default_rng(2)))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    inertia = sum(
+        stream.score(batch) for batch in _generate_blob_batches(n, k, d, batch_size, np.random.default_rng(2))
+    )
+    print(f"  stream\tinertia: {inertia:.0f}\t{elapsed:.2f} s\tpeak: {peak / 2**20:.1f} MiB")
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = np.concatenate(list(_generate_blob_batches(n, k, d, batch_size, np.random.default_rng(2))))
+    clustering = ArrayKMeans(data, rng=np.random.default_rng(0)).run(k)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  array\tinertia: {clustering.inertia:.0f}\t{elapsed:.2f} s\tpeak: {peak / 2**20:.1f} MiB")
+
+
+def _benchmark_hamerly() -> None:
+    n, d = 5000, 2
+    data = _generate_blobs(n, 16, d, np.random.default_rng(0)).tolist()
+    for k in [8, 32, 128]:
+        print(f"n = {n}, k = {k}")
+        results = []
+        for assignment in Assignment:
+            k_means = KMeans([DataPoint(row) for row in data], rng=random.Random(0), assignment=assignment)
+            start = time.perf_counter()
+            result = k_means.fit(k)
+            elapsed = time.perf_counter() - start
+            results.append(result.labels)
+            print(
+                f"  {assignment.name}\titerations: {result.iterations}"
+                f"\tdistances: {k_means.distance_evaluations}\t{elapsed:.2f} s"
+            )
+        print(f"  identical: {results[0] == results[1]}")
+
+
+def _benchmark_store() -> None:
+    n = 10**5
+    rng = np.random.default_rng(0)
+    data = rng.uniform(0, 100, size=(n, 2))
+    codes = [f"C{i:06d}" for i in range(n)]
+    rows = data.tolist()
+    print(f"n = {n}, 2 dimensions, 1 string column")
+    tracemalloc.start()
+    start = time.perf_counter()
+    points = [DataPoint(row) for row in rows]
+    KMeans(points)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  DataPoint\t{size / n:.0f} B/point\tbuild + normalize: {elapsed * 1000:.0f} ms")
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = PointStore(data, country_code=codes)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  PointStore\t{size / n:.0f} B/point\tbuild + normalize: {elapsed * 1000:.0f} ms")
+    del points, store
+
+
+if __name__ == "__main__":
+    main()
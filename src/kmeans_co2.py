@@ -1,104 +1,56 @@
-import csv
-import statistics
-from dataclasses import dataclass
-from typing import List, Tuple
+from typing import List
 
 import matplotlib.animation as anm
 import matplotlib.pyplot as plt
+import numpy as np
 
-from src.kmeans import Cluster, DataPoint, KMeans
+from src.indicators import join_indicators, load_indicator
+from src.kmeans import KMeans, replay_labels
+from src.kmeans_store import PointStore
 
+_YEAR = 2018
 
-@dataclass
-class CsvRow:
-    country_name: str
-    country_code: str
-    amount: float
 
-
-class Co2Point(DataPoint):
-    def __init__(self, country_code: str, country_name: str, gdp_amount: float, co2_amount: float):
-        super().__init__([gdp_amount, co2_amount])
-        self.country_code: str = country_code
-        self.country_name: str = country_name
-        self.gdp_amount: float = gdp_amount
-        self.co2_amount: float = co2_amount
-
-
-def _read_gdp_rows() -> List[CsvRow]:
-    return _read_csv_rows("gdp")
-
-
-def _read_co2_rows() -> List[CsvRow]:
-    return _read_csv_rows("dyn")
-
-
-def _read_csv_rows(name: str) -> List[CsvRow]:
-    with open(f"data/{name}.csv", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        return [
-            CsvRow(row["Country Name"], row["Country Code"], float(row["2018"]))
-            for row in reader
-            if len(row["2018"]) > 0 and row["Country Code"] != "WLD"
-        ]
-
-
-def _merge_csv_rows(gdp_rows: List[CsvRow], co2_rows: List[CsvRow]) -> List[Tuple[CsvRow, CsvRow]]:
-    key_gdp_rows = {row.country_code: row for row in gdp_rows}
-    key_co2_rows = {row.country_code: row for row in co2_rows}
-    country_codes = list(set(key_gdp_rows.keys()) & set(key_co2_rows.keys()))
-    country_codes.sort()
-    return [(key_gdp_rows[code], key_co2_rows[code]) for code in country_codes]
+def _create_point_store() -> PointStore:
+    table = join_indicators([(load_indicator("gdp"), _YEAR), (load_indicator("dyn"), _YEAR)], exclude=["WLD"])
+    return PointStore(
+        table.values,
+        dimension_names=("gdp_amount", "co2_amount"),
+        country_code=table.country_codes,
+        country_name=table.country_names,
+    )
 
 
-def _scatter_points(clusters: List[Cluster[Co2Point]]):
-    gdp_amounts, co2_amounts, cluster_indices = zip(
-        *[
-            (point.gdp_amount, point.co2_amount, i)
-            for i, cluster in enumerate(clusters)
-            for point in cluster.points
-            if len(cluster.points) > 0
-        ]
-    )
-    return plt.scatter(x=gdp_amounts, y=co2_amounts, c=cluster_indices, s=5)
+def _scatter_points(store: PointStore, labels: List[int]):
+    return plt.scatter(x=store.column("gdp_amount"), y=store.column("co2_amount"), c=labels, s=5)
 
 
-def _scatter_centroids(clusters: List[Cluster[Co2Point]], **kwargs):
-    gdp_positions, co2_positions, cluster_indices = zip(
-        *[
-            (
-                statistics.mean([point.gdp_amount for point in cluster.points]),
-                statistics.mean([point.co2_amount for point in cluster.points]),
-                i,
-            )
-            for i, cluster in enumerate(clusters)
-            if len(cluster.points) > 0
-        ]
+def _scatter_centroids(store: PointStore, labels: List[int], **kwargs):
+    counts = np.bincount(labels)
+    cluster_indices = np.flatnonzero(counts)
+    gdp_positions, co2_positions = (
+        np.bincount(labels, weights=store.column(name))[cluster_indices] / counts[cluster_indices]
+        for name in ["gdp_amount", "co2_amount"]
     )
     return plt.scatter(x=gdp_positions, y=co2_positions, c=cluster_indices, **kwargs)
 
 
 if __name__ == "__main__":
-    gdp_rows = _read_gdp_rows()
-    co2_rows = _read_co2_rows()
-    merged_rows = _merge_csv_rows(gdp_rows, co2_rows)
-    co2_points = [
-        Co2Point(gdp_row.country_code, gdp_row.country_name, gdp_row.amount, co2_row.amount)
-        for gdp_row, co2_row in merged_rows
-    ]
-    k_means = KMeans(co2_points)
-    cluster_histories = k_means.run(7)
-    for index, cluster in enumerate(cluster_histories[-1]):
+    co2_store = _create_point_store()
+    k_means = KMeans(co2_store)
+    result = k_means.run_best(7)
+    for index, cluster in enumerate(result.clusters):
         print(f"Cluster {index}: {len(cluster.points)}")
+    print(f"Converged after {result.iterations} iterations, inertia: {result.inertia}")
     figure = plt.figure()
     animation = anm.ArtistAnimation(
         figure,
         [
             [
-                _scatter_points(clusters),
-                _scatter_centroids(clusters, marker="*", edgecolors="black"),
+                _scatter_points(co2_store, labels),
+                _scatter_centroids(co2_store, labels, marker="*", edgecolors="black"),
             ]
-            for clusters in cluster_histories
+            for labels in replay_labels(result.history)
         ],
         interval=1000,
         repeat=False,
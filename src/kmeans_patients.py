@@ -5,7 +5,8 @@ from typing import Dict, List, Sequence, Tuple
 
 import matplotlib.pyplot as plt
 
-from src.kmeans import Cluster, DataPoint, KMeans
+from src.kmeans_array import ArrayKMeans
+from src.kmeans_store import PointStore
 
 _DATE_HEADER = "発症_年月日"
 _AGE_HEADER = "患者_年代"
@@ -32,12 +33,6 @@ class ScatterParams:
     c: Sequence[int]
 
 
-class PatientPoint(DataPoint):
-    def __init__(self, row: GroupedPatientRow):
-        super().__init__([row.date, row.age, row.amount])
-        self.row: GroupedPatientRow = row
-
-
 def _read_patient_rows() -> List[PatientRow]:
     with open("data/patients.csv") as f:
         reader = csv.DictReader(f)
@@ -55,24 +50,26 @@ def _group_patient_rows(rows: List[PatientRow]) -> List[GroupedPatientRow]:
     return [GroupedPatientRow(date, age, counted[date, age]) for date, age in counted.keys()]
 
 
-def _convert_as_scatter_params(clusters: List[Cluster[PatientPoint]]) -> ScatterParams:
-    dates, ages, amounts, cluster_indices = zip(
-        *[
-            (point.row.date, point.row.age, point.row.amount, i)
-            for i, cluster in enumerate(clusters)
-            for point in cluster.points
-        ]
+def _create_point_store(rows: List[GroupedPatientRow]) -> PointStore:
+    return PointStore([[row.date, row.age, row.amount] for row in rows], dimension_names=("date", "age", "amount"))
+
+
+def _convert_as_scatter_params(store: PointStore, labels: List[int]) -> ScatterParams:
+    return ScatterParams(
+        x=store.column("date").astype(int).tolist(),
+        y=store.column("age").astype(int).tolist(),
+        s=store.column("amount").astype(int).tolist(),
+        c=labels,
     )
-    return ScatterParams(x=dates, y=ages, s=amounts, c=cluster_indices)
 
 
 if __name__ == "__main__":
     patient_rows = _read_patient_rows()
     grouped_patient_rows = _group_patient_rows(patient_rows)
-    patient_points = [PatientPoint(row) for row in grouped_patient_rows]
-    k_means = KMeans(5, patient_points)
-    clusters = k_means.run()
-    plt.scatter(**_convert_as_scatter_params(clusters).__dict__)
+    patient_store = _create_point_store(grouped_patient_rows)
+    k_means = ArrayKMeans.from_store(patient_store)
+    clustering = k_means.run(5)
+    plt.scatter(**_convert_as_scatter_params(patient_store, clustering.labels.tolist()).__dict__)
     plt.show()
-    # for index, cluster in enumerate(clusters):
+    # for index, cluster in enumerate(result.clusters):
     #     print(f"Cluster {index}: {len(cluster.points)}")
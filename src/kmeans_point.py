@@ -0,0 +1,24 @@
+import math
+from abc import ABC, abstractmethod
+from typing import Iterator, Tuple
+
+
+class Point(ABC):
+    __slots__ = ()
+
+    @property
+    @abstractmethod
+    def dimensions(self) -> Tuple[float, ...]:
+        ...
+
+    @property
+    def num_dimensions(self) -> int:
+        return len(self.dimensions)
+
+    def distance(self, other: "Point") -> float:
+        combined: Iterator[Tuple[float, float]] = zip(self.dimensions, other.dimensions)
+        differences = [(x - y) ** 2 for x, y in combined]
+        return math.sqrt(sum(differences))
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Point) and self.dimensions == other.dimensions
@@ -0,0 +1,84 @@
+import math
+from typing import Any, Dict, Iterator, List, Sequence, Tuple, Union, overload
+
+import numpy as np
+import numpy.typing as npt
+
+from src.kmeans_point import Point
+
+
+def calc_z_score_array(original: np.ndarray) -> np.ndarray:
+    std = original.std(axis=0)
+    return np.divide(original - original.mean(axis=0), std, out=np.zeros_like(original), where=std != 0)
+
+
+class StoredPoint(Point):
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: "PointStore", index: int):
+        self._store: PointStore = store
+        self._index: int = index
+
+    @property
+    def dimensions(self) -> Tuple[float, ...]:
+        return tuple(self._store.dimensions[self._index].tolist())
+
+    def distance(self, other: Point) -> float:
+        return math.dist(self._store.dimensions[self._index].tolist(), other.dimensions)
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def vector(self) -> np.ndarray:
+        return self._store.dimensions[self._index]
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._store.value(name, self._index)
+
+    def __repr__(self) -> str:
+        return tuple(self._store.originals[self._index].tolist()).__repr__()
+
+
+class PointStore(Sequence[StoredPoint]):
+    def __init__(self, originals: npt.ArrayLike, dimension_names: Sequence[str] = (), **columns: npt.ArrayLike):
+        self.originals: np.ndarray = np.asarray(originals, dtype=float)
+        self.dimensions: np.ndarray = calc_z_score_array(self.originals)
+        self._dimension_names: Dict[str, int] = {name: i for i, name in enumerate(dimension_names)}
+        self.columns: Dict[str, np.ndarray] = {name: np.asarray(values) for name, values in columns.items()}
+
+    def column(self, name: str) -> np.ndarray:
+        if name in self._dimension_names:
+            return self.originals[:, self._dimension_names[name]]
+        return self.columns[name]
+
+    def value(self, name: str, index: int) -> Any:
+        if name in self._dimension_names:
+            return float(self.originals[index, self._dimension_names[name]])
+        if name in self.columns:
+            return self.columns[name][index].item()
+        raise AttributeError(name)
+
+    def __len__(self) -> int:
+        return len(self.originals)
+
+    @overload
+    def __getitem__(self, index: int) -> StoredPoint:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[StoredPoint]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[StoredPoint, List[StoredPoint]]:
+        if isinstance(index, slice):
+            return [StoredPoint(self, i) for i in range(len(self))[index]]
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return StoredPoint(self, index % len(self))
+
+    def __iter__(self) -> Iterator[StoredPoint]:
+        return (StoredPoint(self, i) for i in range(len(self)))
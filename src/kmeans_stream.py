@@ -0,0 +1,129 @@
+import csv
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+
+class RunningStats:
+    def __init__(self, num_dimensions: int):
+        self.count: int = 0
+        self.mean: np.ndarray = np.zeros(num_dimensions)
+        self._m2: np.ndarray = np.zeros(num_dimensions)
+
+    def update(self, batch: np.ndarray) -> None:
+        batch_count = len(batch)
+        if batch_count == 0:
+            return
+        batch_mean = batch.mean(axis=0)
+        delta = batch_mean - self.mean
+        total = self.count + batch_count
+        self.mean = self.mean + delta * batch_count / total
+        self._m2 = self._m2 + ((batch - batch_mean) ** 2).sum(axis=0) + delta**2 * self.count * batch_count / total
+        self.count = total
+
+    @property
+    def std(self) -> np.ndarray:
+        if self.count == 0:
+            return np.zeros_like(self._m2)
+        return np.sqrt(self._m2 / self.count)
+
+    def normalize(self, batch: np.ndarray) -> np.ndarray:
+        std = self.std
+        return np.divide(batch - self.mean, std, out=np.zeros_like(batch, dtype=float), where=std != 0)
+
+
+def iter_batches(rows: Iterable[Sequence[float]], batch_size: int) -> Iterator[np.ndarray]:
+    batch: List[Sequence[float]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield np.array(batch, dtype=float)
+            batch = []
+    if len(batch) > 0:
+        yield np.array(batch, dtype=float)
+
+
+def read_csv_batches(path: str, columns: Sequence[str], batch_size: int) -> Iterator[np.ndarray]:
+    with open(path, encoding="utf-8-sig") as f:
+        rows = ([row[column] for column in columns] for row in csv.DictReader(f))
+        yield from iter_batches(
+            ([float(value) for value in row] for row in rows if all(len(value) > 0 for value in row)), batch_size
+        )
+
+
+class MiniBatchKMeans:
+    def __init__(self, k: int, num_dimensions: int, rng: Optional[np.random.Generator] = None):
+        self._k: int = k
+        self._rng: np.random.Generator = rng if rng is not None else np.random.default_rng()
+        self.stats: RunningStats = RunningStats(num_dimensions)
+        self.centroids: Optional[np.ndarray] = None
+        self._counts: np.ndarray = np.zeros(k)
+
+    @property
+    def normalized_centroids(self) -> np.ndarray:
+        assert self.centroids is not None
+        return self.stats.normalize(self.centroids)
+
+    def _seed(self, batch: np.ndarray) -> None:
+        assert self.centroids is not None
+        normalized = self.stats.normalize(batch)
+        empty = np.isnan(self.centroids[:, 0])
+        if empty.all():
+            self.centroids[0] = batch[int(self._rng.integers(len(batch)))]
+            empty[0] = False
+        squared_distances = (
+            ((normalized[:, None, :] - self.normalized_centroids[None, ~empty, :]) ** 2).sum(axis=2).min(axis=1)
+        )
+        for index in np.flatnonzero(empty):
+            cumulative = np.cumsum(squared_distances)
+            if cumulative[-1] == 0:
+                break
+            chosen = int(np.searchsorted(cumulative, self._rng.random() * cumulative[-1], side="right"))
+            self.centroids[index] = batch[chosen]
+            np.minimum(squared_distances, ((normalized - normalized[chosen]) ** 2).sum(axis=1), out=squared_distances)
+
+    def _distances(self, batch: np.ndarray) -> np.ndarray:
+        normalized = self.stats.normalize(batch)
+        centroids = self.normalized_centroids
+        distances = ((normalized[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+        distances[:, np.isnan(centroids[:, 0])] = np.inf
+        return distances
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return np.argmin(self._distances(batch), axis=1)
+
+    def score(self, batch: np.ndarray) -> float:
+        return float(self._distances(batch).min(axis=1).sum())
+
+    def partial_fit(self, batch: np.ndarray) -> None:
+        self.stats.update(batch)
+        if self.centroids is None:
+            self.centroids = np.full((self._k, batch.shape[1]), np.nan)
+        # A batch with fewer than k distinct points leaves centroids empty; later batches fill them in.
+        if np.isnan(self.centroids[:, 0]).any():
+            self._seed(batch)
+        labels = self.predict(batch)
+        batch_counts = np.bincount(labels, minlength=self._k)
+        sums = np.stack([np.bincount(labels, weights=column, minlength=self._k) for column in batch.T], axis=1)
+        updated = batch_counts > 0
+        self._counts[updated] += batch_counts[updated]
+        self.centroids[updated] += (
+            sums[updated] - batch_counts[updated, None] * self.centroids[updated]
+        ) / self._counts[updated, None]
+
+    def fit(self, batches: Iterable[np.ndarray]) -> "MiniBatchKMeans":
+        for batch in batches:
+            self.partial_fit(batch)
+        return self
+
+
+def main() -> None:
+    k_means = MiniBatchKMeans(3, 2, rng=np.random.default_rng(0))
+    k_means.fit(read_csv_batches("data/gdp.csv", ["2017", "2018"], batch_size=64))
+    print(f"Points: {k_means.stats.count}")
+    for index, centroid in enumerate(k_means.centroids if k_means.centroids is not None else []):
+        print(f"Cluster {index}: {centroid}")
+
+
+if __name__ == "__main__":
+    main()
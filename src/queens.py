@@ -1,26 +1,54 @@
-from typing import Dict, List
+from itertools import combinations
+from typing import Dict, List, Set
 
-from src.csp import CSP, Constraint
+from src.csp import (
+    CSP,
+    BinaryConstraint,
+    Constraint,
+    Inference,
+    ValueOrdering,
+    VariableSelection,
+)
 
 
 def main() -> None:
-    columns: List[int] = [1, 2, 3, 4, 5, 6, 7, 8]
+    for inference in Inference:
+        for variable_selection in VariableSelection:
+            for value_ordering in ValueOrdering:
+                csp = _build_queens_csp(8, variable_selection, value_ordering, inference)
+                solution = csp.backtracking_search()
+                if solution is None:
+                    print("No solution found!")
+                else:
+                    print(
+                        f"{inference.name}\t{variable_selection.name}\t{value_ordering.name}\t"
+                        f"nodes: {csp.nodes}\t{solution}"
+                    )
+    csp = _build_queens_csp(8, VariableSelection.MRV, ValueOrdering.DOMAIN, Inference.FORWARD_CHECKING)
+    print(f"solutions: {csp.count_solutions()}\tnodes: {csp.nodes}")
+
+
+def _build_queens_csp(
+    size: int, variable_selection: VariableSelection, value_ordering: ValueOrdering, inference: Inference
+) -> CSP[int, int]:
+    columns: List[int] = list(range(1, size + 1))
     rows: Dict[int, List[int]] = {}
     for column in columns:
-        rows[column] = [1, 2, 3, 4, 5, 6, 7, 8]
-    csp: CSP[int, int] = CSP(columns, rows)
-    csp.add_constraint(QueensConstraint(columns))
-    solution = csp.backtracking_search()
-    if solution is None:
-        print("No solution found!")
+        rows[column] = list(range(1, size + 1))
+    csp: CSP[int, int] = CSP(columns, rows, variable_selection, value_ordering, inference)
+    if inference == Inference.MAC:
+        for first, second in combinations(columns, 2):
+            csp.add_constraint(QueensPairConstraint(first, second))
     else:
-        print(solution)
+        csp.add_constraint(QueensConstraint(columns))
+    return csp
 
 
 class QueensConstraint(Constraint[int, int]):
     def __init__(self, columns: List[int]) -> None:
         super().__init__(columns)
         self.columns = columns
+        self.reset()
 
     def satisfied(self, assignment: Dict[int, int]) -> bool:
         for q1c, q1r in assignment.items():
@@ -33,5 +61,30 @@ class QueensConstraint(Constraint[int, int]):
                         return False
         return True
 
+    def reset(self) -> None:
+        self._rows: Set[int] = set()
+        self._diagonals: Set[int] = set()
+        self._anti_diagonals: Set[int] = set()
+
+    def assign(self, variable: int, value: int, assignment: Dict[int, int]) -> bool:
+        diagonal, anti_diagonal = value - variable, value + variable
+        if value in self._rows or diagonal in self._diagonals or anti_diagonal in self._anti_diagonals:
+            return False
+        self._rows.add(value)
+        self._diagonals.add(diagonal)
+        self._anti_diagonals.add(anti_diagonal)
+        return True
+
+    def unassign(self, variable: int, value: int) -> None:
+        self._rows.remove(value)
+        self._diagonals.remove(value - variable)
+        self._anti_diagonals.remove(value + variable)
+
+
+class QueensPairConstraint(BinaryConstraint[int, int]):
+    def related(self, first_value: int, second_value: int) -> bool:
+        return first_value != second_value and abs(first_value - second_value) != abs(self.first - self.second)
+
 
-main()
+if __name__ == "__main__":
+    main()
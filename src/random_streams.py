@@ -0,0 +1,12 @@
+import random
+from typing import List
+
+import numpy as np
+
+
+def derive_rngs(rng: random.Random, count: int) -> List[random.Random]:
+    return [random.Random(rng.getrandbits(64)) for _ in range(count)]
+
+
+def derive_generators(rng: np.random.Generator, count: int) -> List[np.random.Generator]:
+    return [np.random.default_rng(seed) for seed in rng.integers(2**63, size=count)]
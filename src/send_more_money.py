@@ -1,6 +1,7 @@
+from itertools import combinations
 from typing import Dict, List
 
-from src.csp import CSP, Constraint
+from src.csp import CSP, Constraint, Inference, NotEqualConstraint
 
 
 def main() -> None:
@@ -9,13 +10,16 @@ def main() -> None:
     for letter in letters:
         possible_digits[letter] = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]
     possible_digits["M"] = [1]
-    csp: CSP[str, int] = CSP(letters, possible_digits)
-    csp.add_constraint(SendMoreMoneyConstraint(letters))
-    solution = csp.backtracking_search()
-    if solution is None:
-        print("No solution found!")
-    else:
-        print(solution)
+    for inference in Inference:
+        csp: CSP[str, int] = CSP(letters, possible_digits, inference=inference)
+        csp.add_constraint(SendMoreMoneyConstraint(letters))
+        for first, second in combinations(letters, 2):
+            csp.add_constraint(NotEqualConstraint(first, second))
+        solution = csp.backtracking_search()
+        if solution is None:
+            print("No solution found!")
+        else:
+            print(f"{inference.name}\tnodes: {csp.nodes}\t{solution}")
 
 
 class SendMoreMoneyConstraint(Constraint[str, int]):
@@ -40,4 +44,5 @@ class SendMoreMoneyConstraint(Constraint[str, int]):
         return True
 
 
-main()
+if __name__ == "__main__":
+    main()
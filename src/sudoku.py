@@ -1,15 +1,16 @@
 import time
-from typing import List
+from typing import Iterable, List
 
 Sudoku = List[int]
 
 
-def print_sudoku_history(sudoku_history: List[Sudoku]) -> None:
+def print_sudoku_history(sudoku_history: Iterable[Sudoku], interval: float = 0) -> None:
     turn = 1
     for past in sudoku_history:
         print(f"turn: {turn}\n{convert_sudoku_text(past)}")
         turn += 1
-        time.sleep(0.01)
+        if interval > 0:
+            time.sleep(interval)
 
 
 def convert_sudoku_text(sudoku: Sudoku) -> str:
@@ -28,3 +29,11 @@ def convert_sudoku_text(sudoku: Sudoku) -> str:
             number_line += cell
         lines.append(number_line)
     return "\n".join(lines)
+
+
+def parse_sudoku_line(line: str) -> Sudoku:
+    if len(line) != 81:
+        raise ValueError(f"expected 81 cells, got {len(line)}")
+    if any(c not in ".0123456789" for c in line):
+        raise ValueError(f"unexpected characters in {line!r}")
+    return [0 if c == "." else int(c) for c in line]
@@ -0,0 +1,124 @@
+import sys
+import time
+from typing import Iterable, Iterator, List, Optional
+
+from src.sudoku import Sudoku, convert_sudoku_text, parse_sudoku_line
+
+_ALL_DIGITS = 0b1111111110
+_POPCOUNTS: List[int] = [bin(mask).count("1") for mask in range(1 << 10)]
+_DIGITS: List[List[int]] = [[d for d in range(1, 10) if mask >> d & 1] for mask in range(1 << 10)]
+_UNITS: List[List[int]] = [
+    *[[row * 9 + col for col in range(9)] for row in range(9)],
+    *[[row * 9 + col for row in range(9)] for col in range(9)],
+    *[[(x * 3 + i) * 9 + y * 3 + j for i in range(3) for j in range(3)] for x in range(3) for y in range(3)],
+]
+_CELL_UNITS: List[List[int]] = [[u for u, unit in enumerate(_UNITS) if cell in unit] for cell in range(81)]
+
+
+def main() -> None:
+    with open(sys.argv[1]) as f:
+        lines = [line.strip() for line in f if len(line.strip()) > 0]
+    start = time.perf_counter()
+    solutions = list(solve_sudoku_lines(lines))
+    elapsed = time.perf_counter() - start
+    solved = sum(1 for solution in solutions if solution is not None)
+    print(f"solved {solved}/{len(solutions)} puzzles in {elapsed:.2f} s ({len(solutions) / elapsed:.0f} puzzles/s)")
+    if len(sys.argv) > 2 and sys.argv[2] == "--print":
+        for solution in solutions:
+            print("No solution found!" if solution is None else convert_sudoku_text(solution))
+
+
+def solve_sudoku(sudoku: Sudoku) -> Optional[Sudoku]:
+    cells: List[int] = [0] * 81
+    masks: List[int] = [0] * 27
+    for cell, digit in enumerate(sudoku):
+        if digit != 0 and not _place(cells, masks, cell, digit):
+            return None
+    return _search(cells, masks)
+
+
+def solve_sudoku_lines(lines: Iterable[str]) -> Iterator[Optional[Sudoku]]:
+    for number, line in enumerate(lines, 1):
+        try:
+            sudoku = parse_sudoku_line(line)
+        except ValueError as e:
+            print(f"skipping puzzle {number}: {e}", file=sys.stderr)
+            yield None
+            continue
+        yield solve_sudoku(sudoku)
+
+
+def _candidates(masks: List[int], cell: int) -> int:
+    row, col, block = _CELL_UNITS[cell]
+    return _ALL_DIGITS & ~(masks[row] | masks[col] | masks[block])
+
+
+def _place(cells: List[int], masks: List[int], cell: int, digit: int) -> bool:
+    row, col, block = _CELL_UNITS[cell]
+    bit = 1 << digit
+    if (masks[row] | masks[col] | masks[block]) & bit:
+        return False
+    cells[cell] = digit
+    masks[row] |= bit
+    masks[col] |= bit
+    masks[block] |= bit
+    return True
+
+
+def _propagate(cells: List[int], masks: List[int]) -> bool:
+    progress = True
+    while progress:
+        progress = False
+        for cell in range(81):
+            if cells[cell] != 0:
+                continue
+            candidates = _candidates(masks, cell)
+            if candidates == 0:
+                return False
+            if _POPCOUNTS[candidates] == 1:
+                _place(cells, masks, cell, _DIGITS[candidates][0])
+                progress = True
+        for u, unit in enumerate(_UNITS):
+            seen_once = 0
+            seen_twice = 0
+            for cell in unit:
+                if cells[cell] == 0:
+                    candidates = _candidates(masks, cell)
+                    seen_twice |= seen_once & candidates
+                    seen_once |= candidates
+            if seen_once != _ALL_DIGITS & ~masks[u]:
+                return False
+            for digit in _DIGITS[seen_once & ~seen_twice]:
+                cell = next((c for c in unit if cells[c] == 0 and _candidates(masks, c) >> digit & 1), -1)
+                if cell < 0 or not _place(cells, masks, cell, digit):
+                    return False
+                progress = True
+    return True
+
+
+def _search(cells: List[int], masks: List[int]) -> Optional[Sudoku]:
+    if not _propagate(cells, masks):
+        return None
+    best_cell = -1
+    best_candidates = 0
+    best_count = 10
+    for cell in range(81):
+        if cells[cell] == 0:
+            candidates = _candidates(masks, cell)
+            if _POPCOUNTS[candidates] < best_count:
+                best_cell, best_candidates, best_count = cell, candidates, _POPCOUNTS[candidates]
+                if best_count == 2:
+                    break
+    if best_cell < 0:
+        return cells
+    for digit in _DIGITS[best_candidates]:
+        next_cells, next_masks = cells[:], masks[:]
+        _place(next_cells, next_masks, best_cell, digit)
+        result = _search(next_cells, next_masks)
+        if result is not None:
+            return result
+    return None
+
+
+if __name__ == "__main__":
+    main()
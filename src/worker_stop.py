@@ -0,0 +1,13 @@
+from multiprocessing.synchronize import Event
+from typing import Optional
+
+_stop_event: Optional[Event] = None
+
+
+def init_worker(stop_event: Event) -> None:
+    global _stop_event
+    _stop_event = stop_event
+
+
+def worker_stop_event() -> Optional[Event]:
+    return _stop_event
@@ -0,0 +1,163 @@
+import itertools
+import random
+from typing import Dict, List, Tuple
+
+import pytest
+
+from src.csp import (
+    CSP,
+    AllDifferent,
+    Backtracking,
+    BinaryConstraint,
+    Constraint,
+    Inference,
+    NotEqualConstraint,
+    SearchTrace,
+    TracePolicy,
+    ValueOrdering,
+    VariableSelection,
+    parallel_count_solutions,
+)
+from src.queens import QueensPairConstraint
+
+
+class LessThanConstraint(BinaryConstraint[int, int]):
+    def related(self, first_value: int, second_value: int) -> bool:
+        return first_value < second_value
+
+
+def _random_problem(rng: random.Random) -> Tuple[List[int], Dict[int, List[int]], List[Constraint[int, int]]]:
+    variables = list(range(rng.randint(2, 5)))
+    domains = {v: sorted(rng.sample(range(5), k=rng.randint(1, 4))) for v in variables}
+    constraints: List[Constraint[int, int]] = []
+    for _ in range(rng.randint(1, 4)):
+        kind = rng.randrange(3)
+        if kind == 0:
+            constraints.append(AllDifferent(rng.sample(variables, k=rng.randint(2, len(variables)))))
+        else:
+            first, second = rng.sample(variables, k=2)
+            constraint_type = NotEqualConstraint if kind == 1 else LessThanConstraint
+            constraints.append(constraint_type(first, second))
+    return variables, domains, constraints
+
+
+def _brute_force_count(
+    variables: List[int], domains: Dict[int, List[int]], constraints: List[Constraint[int, int]]
+) -> int:
+    count = 0
+    for values in itertools.product(*[domains[v] for v in variables]):
+        assignment = dict(zip(variables, values))
+        if all(constraint.satisfied(assignment) for constraint in constraints):
+            count += 1
+    return count
+
+
+def _count(
+    variables: List[int], domains: Dict[int, List[int]], constraints: List[Constraint[int, int]], **options
+) -> int:
+    csp: CSP[int, int] = CSP(variables, domains, **options)
+    for constraint in constraints:
+        csp.add_constraint(constraint)
+    return csp.count_solutions()
+
+
+@pytest.mark.parametrize("inference", list(Inference))
+@pytest.mark.parametrize("variable_selection", list(VariableSelection))
+def test_inference_matches_brute_force(inference: Inference, variable_selection: VariableSelection) -> None:
+    rng = random.Random(0)
+    for _ in range(200):
+        variables, domains, constraints = _random_problem(rng)
+        expected = _brute_force_count(variables, domains, constraints)
+        assert _count(variables, domains, constraints, variable_selection=variable_selection, inference=inference) == (
+            expected
+        )
+
+
+@pytest.mark.parametrize("inference", list(Inference))
+def test_all_different_with_spare_values(inference: Inference) -> None:
+    csp: CSP[int, int] = CSP([0, 1], {0: [1], 1: [2, 3]}, inference=inference)
+    csp.add_constraint(AllDifferent([0, 1]))
+    assert csp.count_solutions() == 2
+
+
+def test_all_different_forces_hidden_single() -> None:
+    constraint = AllDifferent([0, 1, 2])
+    assert constraint.propagate({0: [1, 2], 1: [1, 2], 2: [1, 2, 3]}) == {2: [3]}
+    assert AllDifferent([0, 1]).propagate({0: [1], 1: [1, 2, 3]}) == {1: [2, 3]}
+
+
+def test_count_solutions_limit() -> None:
+    variables = list(range(3000))
+    csp: CSP[int, int] = CSP(variables, {v: [0, 1] for v in variables})
+    for first, second in zip(variables, variables[1:]):
+        csp.add_constraint(NotEqualConstraint(first, second))
+    assert csp.count_solutions(limit=0) == 0
+    assert csp.count_solutions(limit=1) == 1
+    assert csp.count_solutions(limit=5) == 2
+
+
+@pytest.mark.parametrize("nogood_capacity", [0, 1, 100])
+@pytest.mark.parametrize("value_ordering", list(ValueOrdering))
+@pytest.mark.parametrize("variable_selection", list(VariableSelection))
+def test_backjumping_matches_brute_force(
+    variable_selection: VariableSelection, value_ordering: ValueOrdering, nogood_capacity: int
+) -> None:
+    rng = random.Random(1)
+    for _ in range(200):
+        variables, domains, constraints = _random_problem(rng)
+        expected = _brute_force_count(variables, domains, constraints)
+        count = _count(
+            variables,
+            domains,
+            constraints,
+            variable_selection=variable_selection,
+            value_ordering=value_ordering,
+            backtracking=Backtracking.BACKJUMPING,
+            nogood_capacity=nogood_capacity,
+            rng=random.Random(0),
+        )
+        assert count == expected
+
+
+@pytest.mark.parametrize("value_ordering", list(ValueOrdering))
+def test_backjumping_counts_queens(value_ordering: ValueOrdering) -> None:
+    columns = list(range(6))
+    csp: CSP[int, int] = CSP(
+        columns,
+        {column: list(range(6)) for column in columns},
+        value_ordering=value_ordering,
+        backtracking=Backtracking.BACKJUMPING,
+        nogood_capacity=100,
+    )
+    for first, second in itertools.combinations(columns, 2):
+        csp.add_constraint(QueensPairConstraint(first, second))
+    assert csp.count_solutions() == 4
+
+
+def test_trace_policies_replay_same_final_board() -> None:
+    columns = list(range(6))
+    final_boards = []
+    for policy in [TracePolicy.EVERY_NTH, TracePolicy.RING_BUFFER, TracePolicy.DELTA]:
+        csp: CSP[int, int] = CSP(columns, {column: list(range(6)) for column in columns})
+        for first, second in itertools.combinations(columns, 2):
+            csp.add_constraint(QueensPairConstraint(first, second))
+        csp.trace = SearchTrace(policy)
+        solution = csp.backtracking_search({1: 2})
+        boards = list(csp.trace.replay())
+        assert all(board[1] == 2 for board in boards)
+        assert boards[-1] == solution
+        final_boards.append(boards[-1])
+    assert final_boards[0] == final_boards[1] == final_boards[2]
+
+
+def _queens() -> CSP[int, int]:
+    columns = list(range(6))
+    csp: CSP[int, int] = CSP(columns, {column: list(range(6)) for column in columns})
+    for first, second in itertools.combinations(columns, 2):
+        csp.add_constraint(QueensPairConstraint(first, second))
+    return csp
+
+
+def test_parallel_count_solutions_stops_at_limit() -> None:
+    assert parallel_count_solutions(_queens, workers=2) == 4
+    assert parallel_count_solutions(_queens, workers=2, limit=1) == 1
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from src.genetic import SelectionType
+from src.genetic_array import ArrayGeneticAlgorithm
+from src.genetic_equation import Equation
+
+
+def test_roulette_rejects_negative_fitness() -> None:
+    algorithm: ArrayGeneticAlgorithm[Equation] = ArrayGeneticAlgorithm(
+        Equation,
+        population_size=200,
+        threshold=13.0,
+        selection_type=SelectionType.ROULETTE,
+        rng=np.random.default_rng(0),
+    )
+    with pytest.raises(ValueError):
+        algorithm.run()
+
+
+def test_tournament_reaches_threshold() -> None:
+    algorithm: ArrayGeneticAlgorithm[Equation] = ArrayGeneticAlgorithm(
+        Equation, population_size=200, threshold=13.0, max_generations=1000, rng=np.random.default_rng(0)
+    )
+    assert algorithm.run().fitness() == 13.0
@@ -0,0 +1,25 @@
+import pickle
+import random
+
+import pytest
+
+from src.genetic_sudoku import PermutationSudokuChromosome
+
+_PUZZLE = "000000010400000000020000000000050407008000300001090000300400200050100000000806000"
+
+
+def test_for_puzzle_keeps_clues() -> None:
+    chromosome_type = PermutationSudokuChromosome.for_puzzle(_PUZZLE)
+    rng = random.Random(0)
+    chromosome = chromosome_type.random_instance(rng)
+    assert all(clue == 0 or chromosome.values[i] == clue for i, clue in enumerate(chromosome_type.clues))
+    mutated = chromosome.mutate(rng)
+    assert all(clue == 0 or mutated.values[i] == clue for i, clue in enumerate(chromosome_type.clues))
+    restored = pickle.loads(pickle.dumps(chromosome))
+    assert type(restored) is chromosome_type
+    assert restored.values == chromosome.values
+
+
+def test_unsatisfiable_row_raises() -> None:
+    with pytest.raises(ValueError):
+        PermutationSudokuChromosome.for_puzzle("0234567891" + "0" * 71).random_instance(random.Random(0))
@@ -0,0 +1,44 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.kmeans import Assignment, DataPoint, Initialization, KMeans
+from src.kmeans_array import ArrayKMeans
+from src.kmeans_store import PointStore
+
+
+@pytest.mark.parametrize("initialization", list(Initialization))
+@pytest.mark.parametrize("k", [2, 5, 12])
+def test_hamerly_matches_brute_force(k: int, initialization: Initialization) -> None:
+    rng = random.Random(k)
+    originals = [[rng.gauss(0, 1) for _ in range(3)] for _ in range(300)]
+    results = [
+        KMeans(
+            [DataPoint(original) for original in originals],
+            rng=random.Random(0),
+            initialization=initialization,
+            assignment=assignment,
+        ).fit(k)
+        for assignment in Assignment
+    ]
+    brute_force, hamerly = results
+    assert hamerly.labels == brute_force.labels
+    assert hamerly.iterations == brute_force.iterations
+    assert hamerly.inertia == pytest.approx(brute_force.inertia)
+
+
+def test_subset_of_store_views_leaves_store_untouched() -> None:
+    rng = random.Random(0)
+    store = PointStore([[rng.gauss(0, 1) for _ in range(3)] for _ in range(40)])
+    before = store.dimensions.copy()
+    result = KMeans(store[:10], rng=random.Random(0)).fit(3)
+    assert (store.dimensions == before).all()
+    assert sorted(point.index for cluster in result.clusters for point in cluster.points) == list(range(10))
+
+
+def test_array_iterations_match_list_iterations() -> None:
+    originals = [[2.0, 1.0, 1.0], [2.0, 2.0, 5.0], [3.0, 1.5, 2.5]]
+    result = KMeans([DataPoint(original) for original in originals], rng=random.Random(0)).fit(2)
+    clustering = ArrayKMeans(np.array(originals), rng=np.random.default_rng(0)).run(2)
+    assert clustering.iterations == result.iterations == 1
@@ -0,0 +1,15 @@
+import numpy as np
+
+from src.kmeans_stream import MiniBatchKMeans
+
+
+def test_empty_centroids_are_seeded_from_later_batches() -> None:
+    rng = np.random.default_rng(0)
+    k_means = MiniBatchKMeans(3, 2, rng=np.random.default_rng(0))
+    k_means.partial_fit(np.ones((8, 2)))
+    assert k_means.centroids is not None
+    assert np.isnan(k_means.centroids[:, 0]).sum() == 2
+    for center in ([0.0, 0.0], [10.0, 0.0], [0.0, 10.0]):
+        k_means.partial_fit(rng.normal(center, 0.1, size=(64, 2)))
+    assert not np.isnan(k_means.centroids).any()
+    assert len(np.unique(k_means.predict(rng.normal([10.0, 0.0], 0.1, size=(16, 2))))) == 1
@@ -0,0 +1,12 @@
+import pytest
+
+from src.sudoku_solver import solve_sudoku_lines
+
+_PUZZLE = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+
+
+def test_bad_lines_do_not_stop_the_batch(capsys: pytest.CaptureFixture) -> None:
+    solutions = list(solve_sudoku_lines([_PUZZLE[:80], _PUZZLE[:80] + "x", _PUZZLE]))
+    assert solutions[:2] == [None, None]
+    assert solutions[2] is not None and all(digit != 0 for digit in solutions[2])
+    assert "skipping puzzle 1" in capsys.readouterr().err